@@ -1,6 +1,19 @@
 from __future__ import annotations
 
+import os
+
+from types import TracebackType
+
 class Block:
+    def __init__(
+        self,
+        start_line: int,
+        end_line: int,
+        checksum: int,
+        name: str,
+        block_type: str,
+        body_start_line: int | None = None,
+    ) -> None: ...
     @property
     def start_line(self) -> int: ...
     @property
@@ -15,6 +28,14 @@ class Block:
     def body_start_line(self) -> int: ...
 
 class Fingerprint:
+    def __init__(
+        self,
+        filename: str,
+        checksums: list[int],
+        file_hash: str,
+        mtime: float,
+        blocks: list[Block] | None = None,
+    ) -> None: ...
     @property
     def filename(self) -> str: ...
     @property
@@ -52,8 +73,18 @@ class ImportResult:
     @property
     def test_execution_count(self) -> int: ...
 
+class Transaction:
+    def __enter__(self) -> Transaction: ...
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> bool: ...
+
 class PytestDiffDatabase:
-    def __init__(self, db_path: str) -> None: ...
+    def __init__(self, db_path: str | os.PathLike[str]) -> None: ...
+    def transaction(self) -> Transaction: ...
     def save_test_execution(
         self,
         test_name: str,
@@ -68,26 +99,47 @@ class PytestDiffDatabase:
     def clear_cache(self) -> None: ...
     def get_stats(self) -> dict[str, int]: ...
     def save_baseline_fingerprint(self, fingerprint: Fingerprint) -> None: ...
+    def save_baseline_fingerprints(self, fingerprints: list[Fingerprint]) -> int: ...
     def get_baseline_fingerprint(self, filename: str) -> Fingerprint | None: ...
     def clear_baseline(self) -> None: ...
-    def import_baseline_from(self, source_db_path: str) -> ImportResult: ...
-    def merge_baseline_from(self, source_db_path: str) -> ImportResult: ...
-    def get_external_metadata(self, source_db_path: str, key: str) -> str | None: ...
+    def import_baseline_from(self, source_db_path: str | os.PathLike[str]) -> ImportResult: ...
+    def merge_baseline_from(self, source_db_path: str | os.PathLike[str]) -> ImportResult: ...
+    def get_external_metadata(
+        self, source_db_path: str | os.PathLike[str], key: str
+    ) -> str | None: ...
+    def get_external_metadata_bulk(
+        self, source_db_paths: list[str | os.PathLike[str]], key: str
+    ) -> dict[str, str | None]: ...
     def set_metadata(self, key: str, value: str) -> None: ...
     def get_metadata(self, key: str) -> str | None: ...
     def get_test_dependencies(self, test_name: str) -> list[str]: ...
     def get_file_dependents(self, filename: str) -> list[str]: ...
     def close(self) -> None: ...
+    def __enter__(self) -> PytestDiffDatabase: ...
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> bool: ...
 
 class FingerprintCache:
     def __init__(self, max_size: int | None = None) -> None: ...
     def get_or_calculate(self, path: str) -> Fingerprint: ...
+    def insert(self, path: str, fingerprint: Fingerprint) -> None: ...
     def clear(self) -> None: ...
     def stats(self) -> tuple[int, int, float]: ...
     def size(self) -> int: ...
     def max_size(self) -> int: ...
 
-def calculate_fingerprint(path: str, project_root: str | None = None) -> Fingerprint: ...
+def calculate_fingerprint(
+    path: str | os.PathLike[str],
+    project_root: str | os.PathLike[str] | None = None,
+    cache: FingerprintCache | None = None,
+) -> Fingerprint: ...
+def calculate_fingerprints_batch(
+    paths: list[str | os.PathLike[str]], project_root: str | os.PathLike[str] | None = None
+) -> list[Fingerprint]: ...
 def detect_changes(db_path: str, project_root: str, scope_paths: list[str]) -> ChangedFiles: ...
 def process_coverage_data(
     coverage_data: dict[str, list[int]],
@@ -125,7 +125,7 @@ def _download_single_baseline(
 
     try:
         import_start = time.time()
-        result = db.import_baseline_from(str(cache_path))
+        result = db.import_baseline_from(cache_path)
         log.debug(
             "Imported %s baseline fingerprints and %s test executions in %.3fs",
             result.baseline_count,
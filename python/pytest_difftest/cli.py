@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import argparse
+import os
 import shutil
 import sys
 import tempfile
@@ -49,6 +50,28 @@ def _resolve_inputs(inputs: list[str]) -> tuple[list[str], Path | None]:
     return local_paths, temp_dir
 
 
+def _prefetch_inputs(paths: list[str]) -> None:
+    """Ask the kernel to start reading every input database in the background.
+
+    Inputs are merged one at a time; with ``POSIX_FADV_WILLNEED`` the reads of
+    later inputs overlap with the merge of earlier ones. No-op where
+    ``posix_fadvise`` is unavailable (macOS, Windows).
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return
+    for path in paths:
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+
 def merge_databases(output: str, inputs: list[str]) -> int:
     """Merge multiple pytest-difftest databases into one.
 
@@ -98,10 +121,11 @@ def merge_databases(output: str, inputs: list[str]) -> int:
 
     try:
         local_path = Path(local_output)
-        db = PytestDiffDatabase(str(local_path))
+        db = PytestDiffDatabase(local_path)
 
         # Check for commit consistency before merging
         _check_merge_commit_consistency(db, local_inputs)
+        _prefetch_inputs(local_inputs)
 
         total_baselines = 0
         total_tests = 0
@@ -140,13 +164,16 @@ def _check_merge_commit_consistency(db: Any, inputs: list[str]) -> None:
     """Check that all input databases have the same baseline_commit."""
     commits: dict[str, list[str]] = {}  # commit -> list of filenames
 
+    try:
+        # Unreadable inputs map to None
+        input_commits = db.get_external_metadata_bulk(inputs, "baseline_commit")
+    except Exception:
+        return  # Silently skip if we can't read metadata
+
     for input_path in inputs:
-        try:
-            commit = db.get_external_metadata(input_path, "baseline_commit")
-            if commit:
-                commits.setdefault(commit, []).append(Path(input_path).name)
-        except Exception:
-            pass  # Silently skip if we can't read metadata
+        commit = input_commits.get(input_path)
+        if commit:
+            commits.setdefault(commit, []).append(Path(input_path).name)
 
     if len(commits) > 1:
         details = ", ".join(f"{sha[:8]}({len(files)} files)" for sha, files in commits.items())
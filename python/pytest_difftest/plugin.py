@@ -261,7 +261,7 @@ class PytestDiffPlugin:
         # Open existing DB (schema already created by controller)
         try:
             db_start = time.time()
-            self.db = _core.PytestDiffDatabase(str(self.db_path))
+            self.db = _core.PytestDiffDatabase(self.db_path)
             logger.debug("Worker opened database in %.3fs", time.time() - db_start)
         except Exception as e:
             logger.warning("⚠ pytest-difftest worker: Could not open database: %s", e)
@@ -313,7 +313,7 @@ class PytestDiffPlugin:
         # Initialize Rust components
         try:
             db_start = time.time()
-            self.db = _core.PytestDiffDatabase(str(self.db_path))
+            self.db = _core.PytestDiffDatabase(self.db_path)
             logger.debug("Database opened in %.3fs", time.time() - db_start)
             if not (self.remote_url and not self.baseline):
                 logger.debug("pytest-difftest: Using database at %s", self.db_path)
@@ -329,7 +329,7 @@ class PytestDiffPlugin:
                 else:
                     logger.info("  Creating new database at %s", self.db_path)
                 db_start = time.time()
-                self.db = _core.PytestDiffDatabase(str(self.db_path))
+                self.db = _core.PytestDiffDatabase(self.db_path)
                 logger.debug("Database created in %.3fs", time.time() - db_start)
             except Exception as e2:
                 logger.warning("⚠ pytest-difftest: Failed to create database: %s", e2)
@@ -646,7 +646,10 @@ class PytestDiffPlugin:
             test_file = Path(item.fspath).resolve()
             if test_file.exists() and test_file.suffix == ".py":
                 try:
-                    fp = _core.calculate_fingerprint(str(test_file), str(get_rootdir(self.config)))
+                    # Cached: every skipped test in the file needs the same fingerprint
+                    fp = _core.calculate_fingerprint(
+                        test_file, get_rootdir(self.config), self.fp_cache
+                    )
                     self.test_execution_batch.append((item.nodeid, [fp], 0.0, False))
                     if len(self.test_execution_batch) >= self.batch_size:
                         self._flush_test_batch()
@@ -2,9 +2,30 @@
 
 from __future__ import annotations
 
+import contextlib
+import os
+import tempfile
 from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+# Upper bound on the default number of concurrent transfers in download_all
+MAX_DOWNLOAD_WORKERS = 32
+
+# Environment variable overriding the download_all concurrency
+DOWNLOAD_CONCURRENCY_ENV_VAR = "PYTEST_DIFFTEST_DOWNLOAD_CONCURRENCY"
+
+# Environment variable opting in to compressed uploads ("zstd"; default: off)
+UPLOAD_COMPRESSION_ENV_VAR = "PYTEST_DIFFTEST_UPLOAD_COMPRESSION"
+
+# Files smaller than this are uploaded as-is; compressing them saves little
+COMPRESS_MIN_SIZE = 64 * 1024
+
+# Frame magic number that starts every zstd stream (a SQLite file starts with
+# "SQLite format 3"), so compressed objects are recognised without a key suffix
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
 
 class StorageAuthenticationError(Exception):
     """Raised when remote storage credentials are missing or invalid."""
@@ -25,7 +46,7 @@ class BaselineStorage(ABC):
         """Download a remote file to a local path.
 
         Returns ``True`` if a new file was downloaded, ``False`` if the
-        cached copy is already up-to-date (ETag / mtime match).
+        cached copy is already up-to-date (ETag / size+mtime match).
 
         Raises on failure (other than cache-hit).
         """
@@ -45,3 +66,105 @@ class BaselineStorage(ABC):
         Default implementation returns empty list.
         """
         return []
+
+
+def download_concurrency() -> int:
+    """Number of transfers ``download_all`` may run at once.
+
+    Defaults to four per CPU (transfers are I/O-bound), at most
+    ``MAX_DOWNLOAD_WORKERS``. A positive integer in
+    ``PYTEST_DIFFTEST_DOWNLOAD_CONCURRENCY`` overrides it; other values are
+    ignored.
+    """
+    value = os.environ.get(DOWNLOAD_CONCURRENCY_ENV_VAR, "").strip()
+    if value.isdigit() and int(value) > 0:
+        return int(value)
+    return min(MAX_DOWNLOAD_WORKERS, (os.cpu_count() or 1) * 4)
+
+
+def fetch_all(fetch: Callable[[str, Path], object], keys: list[str], local_dir: Path) -> list[Path]:
+    """Call ``fetch(key, local_dir / <basename of key>)`` for every key.
+
+    Transfers are I/O-bound, so they run on a thread pool. Returns the local
+    paths in the order of *keys*; the first failed transfer is re-raised.
+
+    Raises ``ValueError`` before transferring anything if two keys share a
+    basename (e.g. ``a/baseline.db`` and ``b/baseline.db``), since they would
+    be written to the same local file at the same time.
+    """
+    targets = [local_dir / Path(key).name for key in keys]
+    by_target: dict[Path, list[str]] = {}
+    for key, target in zip(keys, targets):
+        by_target.setdefault(target, []).append(key)
+    clashes = [sorted(same) for same in by_target.values() if len(same) > 1]
+    if clashes:
+        raise ValueError(
+            "Remote baselines with the same file name cannot be downloaded to one "
+            f"directory: {'; '.join(', '.join(same) for same in clashes)}"
+        )
+    if len(keys) <= 1:
+        for key, target in zip(keys, targets):
+            fetch(key, target)
+        return targets
+
+    workers = min(len(keys), download_concurrency())
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        # Consume the iterator so exceptions from workers propagate
+        for _ in pool.map(fetch, keys, targets):
+            pass
+    return targets
+
+
+@contextlib.contextmanager
+def compressed_for_upload(local_path: Path) -> Iterator[Path]:
+    """Yield the file to upload in place of *local_path*.
+
+    Compression is opt-in, because a compressed object is stored under the
+    plain ``.db`` key and readers without ``zstandard`` (including older
+    pytest-difftest versions) cannot open it. With
+    ``PYTEST_DIFFTEST_UPLOAD_COMPRESSION=zstd`` and a file of at least
+    ``COMPRESS_MIN_SIZE`` bytes, yields a temporary zstd-compressed copy
+    (removed on exit); otherwise yields *local_path* unchanged.
+    """
+    mode = os.environ.get(UPLOAD_COMPRESSION_ENV_VAR, "").strip().lower()
+    if mode != "zstd" or os.path.getsize(local_path) < COMPRESS_MIN_SIZE:
+        yield local_path
+        return
+    try:
+        import zstandard
+    except ImportError as exc:
+        raise ImportError(
+            f"{UPLOAD_COMPRESSION_ENV_VAR}=zstd requires zstandard. Install with: "
+            "pip install pytest-difftest[zstd]"
+        ) from exc
+
+    fd, tmp = tempfile.mkstemp(suffix=".zst", dir=local_path.parent)
+    try:
+        with open(local_path, "rb") as src, os.fdopen(fd, "wb") as dst:
+            zstandard.ZstdCompressor(level=3, threads=-1).copy_stream(src, dst)
+        yield Path(tmp)
+    finally:
+        os.unlink(tmp)
+
+
+def decompress_in_place(local_path: Path) -> None:
+    """Decompress *local_path* if it holds a zstd stream, else leave it as-is."""
+    with open(local_path, "rb") as f:
+        if f.read(len(ZSTD_MAGIC)) != ZSTD_MAGIC:
+            return
+    try:
+        import zstandard
+    except ImportError as exc:
+        raise ImportError(
+            f"{local_path} is zstd-compressed. Install zstandard with: "
+            "pip install pytest-difftest[zstd]"
+        ) from exc
+
+    fd, tmp = tempfile.mkstemp(suffix=".db", dir=local_path.parent)
+    try:
+        with open(local_path, "rb") as src, os.fdopen(fd, "wb") as dst:
+            zstandard.ZstdDecompressor().copy_stream(src, dst)
+        os.replace(tmp, local_path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
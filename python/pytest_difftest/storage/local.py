@@ -2,10 +2,76 @@
 
 from __future__ import annotations
 
+import os
 import shutil
+from collections.abc import Iterator
 from pathlib import Path
 
-from pytest_difftest.storage.base import BaselineStorage
+from pytest_difftest.storage.base import BaselineStorage, fetch_all
+
+
+def _copy_file_range(src: Path, dst: Path, size: int) -> bool:
+    """Copy *size* bytes of *src* to *dst* with ``os.copy_file_range`` (Linux).
+
+    Unlike ``sendfile`` this lets the filesystem share extents (reflinks on
+    btrfs/XFS) instead of moving the data. Returns False when the call is not
+    available for these files, e.g. across filesystems on older kernels, or
+    when it stops short of *size* (procfs, FUSE and some NFS mounts report
+    0 bytes copied early).
+    """
+    if not hasattr(os, "copy_file_range"):
+        return False
+    try:
+        with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+            copied = 0
+            while copied < size:
+                n = os.copy_file_range(fsrc.fileno(), fdst.fileno(), size - copied)
+                if n == 0:
+                    break
+                copied += n
+    except OSError:
+        return False
+    return copied == size
+
+
+def _copy(src: Path, dst: Path, src_stat: os.stat_result | None = None) -> None:
+    """Copy *src* to *dst*, preserving only its timestamps.
+
+    Tries ``copy_file_range`` first, then ``shutil.copyfile``, which copies in
+    the kernel too (``sendfile`` on Linux, ``fcopyfile`` on macOS). Unlike
+    ``shutil.copy2`` neither copies permission bits or extended attributes;
+    only the mtime matters for the cache check.
+
+    Raises ``shutil.SameFileError`` if *dst* is *src*: opening it for
+    writing would truncate the source before anything is copied.
+    """
+    st = src_stat if src_stat is not None else os.stat(src)
+    try:
+        dst_stat = os.stat(dst)
+    except FileNotFoundError:
+        pass
+    else:
+        if os.path.samestat(st, dst_stat):
+            raise shutil.SameFileError(f"{src!r} and {dst!r} are the same file")
+    if not _copy_file_range(src, dst, st.st_size):
+        shutil.copyfile(src, dst)
+    os.utime(dst, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+
+def _walk_db_files(directory: str, key_prefix: str) -> Iterator[str]:
+    """Yield ``key_prefix/<relative path>`` for every .db file under *directory*.
+
+    Uses ``os.scandir`` so file-type checks come from the cached directory
+    entry instead of one ``stat`` per path. Symlinked directories are not
+    followed.
+    """
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            key = f"{key_prefix}/{entry.name}" if key_prefix else entry.name
+            if entry.is_dir(follow_symlinks=False):
+                yield from _walk_db_files(entry.path, key)
+            elif entry.name.endswith(".db") and entry.is_file():
+                yield key
 
 
 class LocalStorage(BaselineStorage):
@@ -24,42 +90,44 @@ class LocalStorage(BaselineStorage):
     def upload(self, local_path: Path, remote_key: str) -> None:
         dest = self.root / remote_key
         dest.parent.mkdir(parents=True, exist_ok=True)
-        shutil.copy2(local_path, dest)
+        _copy(local_path, dest)
 
     def download(self, remote_key: str, local_path: Path) -> bool:
         src = self.root / remote_key
-        if not src.exists():
-            raise FileNotFoundError(f"Remote baseline not found: {src}")
-
-        # Staleness check: skip download if local file exists and is at least
-        # as new as the remote copy.
-        if local_path.exists():
-            local_mtime = local_path.stat().st_mtime
-            remote_mtime = src.stat().st_mtime
-            if local_mtime >= remote_mtime:
+        try:
+            src_stat = os.stat(src)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Remote baseline not found: {src}") from None
+
+        # Cache check: _copy preserves mtime, so a local copy with the same
+        # size and mtime is the remote file we downloaded last time.
+        try:
+            local_stat = os.stat(local_path)
+        except FileNotFoundError:
+            pass
+        else:
+            if (local_stat.st_size, local_stat.st_mtime_ns) == (
+                src_stat.st_size,
+                src_stat.st_mtime_ns,
+            ):
                 return False
 
         local_path.parent.mkdir(parents=True, exist_ok=True)
-        shutil.copy2(src, local_path)
+        _copy(src, local_path, src_stat)
         return True
 
     def list_baselines(self, prefix: str = "") -> list[str]:
         """List all .db files under a prefix."""
         search_path = self.root / prefix if prefix else self.root
-        if not search_path.exists():
+        if not search_path.is_dir():
             return []
-        return [str(p.relative_to(self.root)) for p in search_path.glob("**/*.db")]
+        key_prefix = Path(prefix).as_posix() if prefix else ""
+        return list(_walk_db_files(str(search_path), "" if key_prefix == "." else key_prefix))
 
     def download_all(self, local_dir: Path, prefix: str = "") -> list[Path]:
         """Download all .db files from the configured prefix to local_dir."""
-        keys = self.list_baselines(prefix)
-        downloaded: list[Path] = []
-
-        for key in keys:
-            src = self.root / key
-            filename = Path(key).name
-            local_path = local_dir / filename
-            shutil.copy2(src, local_path)
-            downloaded.append(local_path)
-
-        return downloaded
+        return fetch_all(
+            lambda key, local_path: _copy(self.root / key, local_path),
+            self.list_baselines(prefix),
+            local_dir,
+        )
@@ -6,14 +6,87 @@ IAM roles, etc.).
 
 ETag-based conditional downloads: a ``.etag`` sidecar file is stored next to
 the cached DB so we can skip re-downloading unchanged baselines.
+
+With ``PYTEST_DIFFTEST_UPLOAD_COMPRESSION=zstd`` (requires ``pip install
+pytest-difftest[zstd]``), baselines of 64 KiB or more are uploaded
+zstd-compressed under the same key; downloads decompress them.
 """
 
 from __future__ import annotations
 
+import functools
+import os
 from pathlib import Path
 from typing import Any
 
-from pytest_difftest.storage.base import BaselineStorage, StorageAuthenticationError
+from pytest_difftest.storage.base import (
+    DOWNLOAD_CONCURRENCY_ENV_VAR,
+    MAX_DOWNLOAD_WORKERS,
+    BaselineStorage,
+    StorageAuthenticationError,
+    compressed_for_upload,
+    decompress_in_place,
+    download_concurrency,
+    fetch_all,
+)
+
+
+# Environment variables that decide which S3 client boto3 builds
+_CLIENT_ENV_VARS = (
+    "AWS_PROFILE",
+    "AWS_REGION",
+    "AWS_DEFAULT_REGION",
+    "AWS_ENDPOINT_URL",
+    "AWS_ENDPOINT_URL_S3",
+    "AWS_CA_BUNDLE",
+    # Credentials and the files boto3 reads them from
+    "AWS_ACCESS_KEY_ID",
+    "AWS_SECRET_ACCESS_KEY",
+    "AWS_SESSION_TOKEN",
+    "AWS_SHARED_CREDENTIALS_FILE",
+    "AWS_CONFIG_FILE",
+    # Sizes the connection pool
+    DOWNLOAD_CONCURRENCY_ENV_VAR,
+)
+
+
+@functools.lru_cache(maxsize=8)
+def _shared_client(client_env: tuple[str | None, ...]) -> Any:
+    """Build one boto3 S3 client per *client_env*, reused by every S3Storage.
+
+    Reusing the client keeps its HTTPS connection pool and resolved
+    credentials across storages created in the same process.
+    """
+    try:
+        import boto3
+        from botocore.config import Config
+    except ImportError as exc:
+        raise ImportError(
+            "boto3 is required for S3 storage. Install with: pip install pytest-difftest[s3]"
+        ) from exc
+    # The client is shared by the download_all threads; size its connection
+    # pool so they don't queue behind the default of 10
+    pool_size = max(MAX_DOWNLOAD_WORKERS, download_concurrency())
+    return boto3.client("s3", config=Config(max_pool_connections=pool_size))
+
+
+@functools.lru_cache(maxsize=8)
+def _transfer_config(max_concurrency: int = 10) -> Any:
+    """Managed-transfer settings for large (per-worker) baseline files.
+
+    Files above 16 MiB are split into 16 MiB parts moved by up to
+    *max_concurrency* threads; the larger I/O chunks and queue keep disk
+    writes from throttling them.
+    """
+    from boto3.s3.transfer import TransferConfig
+
+    return TransferConfig(
+        multipart_threshold=16 * 1024 * 1024,
+        multipart_chunksize=16 * 1024 * 1024,
+        max_concurrency=max_concurrency,
+        io_chunksize=1024 * 1024,
+        max_io_queue=1000,
+    )
 
 
 class S3Storage(BaselineStorage):
@@ -33,13 +106,7 @@ class S3Storage(BaselineStorage):
     @property
     def client(self) -> Any:
         if self._client is None:
-            try:
-                import boto3
-            except ImportError as exc:
-                raise ImportError(
-                    "boto3 is required for S3 storage. Install with: pip install pytest-difftest[s3]"
-                ) from exc
-            self._client = boto3.client("s3")
+            self._client = _shared_client(tuple(os.environ.get(v) for v in _CLIENT_ENV_VARS))
         return self._client
 
     def _s3_key(self, remote_key: str) -> str:
@@ -67,7 +134,10 @@ class S3Storage(BaselineStorage):
     def upload(self, local_path: Path, remote_key: str) -> None:
         s3_key = self._s3_key(remote_key)
         try:
-            self.client.upload_file(str(local_path), self.bucket, s3_key)
+            with compressed_for_upload(local_path) as upload_path:
+                self.client.upload_file(
+                    str(upload_path), self.bucket, s3_key, Config=_transfer_config()
+                )
         except Exception as exc:
             self._check_auth_error(exc, f"uploading to s3://{self.bucket}/{s3_key}")
             raise
@@ -106,6 +176,7 @@ class S3Storage(BaselineStorage):
         with open(local_path, "wb") as f:
             for chunk in response["Body"].iter_chunks():
                 f.write(chunk)
+        decompress_in_place(local_path)
 
         new_etag = response.get("ETag", "")
         if new_etag:
@@ -153,13 +224,14 @@ class S3Storage(BaselineStorage):
             List of local file paths that were downloaded.
         """
         keys = self.list_baselines(prefix)
-        downloaded: list[Path] = []
+        # Create the (thread-safe) client once, before the worker threads start
+        client = self.client
+        # Split the concurrency budget between files and the parts of each
+        # file: one large baseline gets every thread, many small ones one each
+        config = _transfer_config(max(1, download_concurrency() // max(1, len(keys))))
 
-        for key in keys:
-            # Use the filename from the key
-            filename = Path(key).name
-            local_path = local_dir / filename
-            self.client.download_file(self.bucket, key, str(local_path))
-            downloaded.append(local_path)
+        def fetch(key: str, local_path: Path) -> None:
+            client.download_file(self.bucket, key, str(local_path), Config=config)
+            decompress_in_place(local_path)
 
-        return downloaded
+        return fetch_all(fetch, keys, local_dir)
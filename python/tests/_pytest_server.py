@@ -0,0 +1,78 @@
+"""
+Long-lived pytest runner used by the ``persistent_pytest`` fixture.
+
+Reads pickled ``(cwd, args)`` requests from stdin, runs ``pytest.main(args)``
+in *cwd* and writes back pickled ``(ret, stdout, stderr)`` on the original
+stdout. File descriptors 1 and 2 are redirected for each run so that plugin
+logging and Rust ``eprintln!`` output are captured like in a subprocess.
+
+Modules imported by a run are dropped afterwards, so each run re-imports the
+project under test from disk (same isolation as pytester's in-process mode).
+"""
+
+import importlib
+import os
+import pickle
+import sys
+import tempfile
+
+import coverage  # noqa: F401  # Keep the C tracer loaded across runs
+import pytest
+
+# PyO3 extensions cannot be initialized twice, so import the plugin (and the
+# Rust core) before the per-run sys.modules snapshot is taken
+import pytest_difftest.plugin  # noqa: F401
+
+
+def _run(cwd, args):
+    """Run pytest once and return ``(exit code, stdout, stderr)``."""
+    modules = set(sys.modules)
+    path = list(sys.path)
+    old_cwd = os.getcwd()
+
+    with tempfile.TemporaryFile() as out, tempfile.TemporaryFile() as err:
+        saved_fds = os.dup(1), os.dup(2)
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os.dup2(out.fileno(), 1)
+        os.dup2(err.fileno(), 2)
+        try:
+            # Files created since the last run must be visible to imports
+            importlib.invalidate_caches()
+            os.chdir(cwd)
+            sys.path.insert(0, cwd)
+            ret = int(pytest.main(list(args)))
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            for fd, saved in zip((1, 2), saved_fds):
+                os.dup2(saved, fd)
+                os.close(saved)
+            os.chdir(old_cwd)
+            sys.path[:] = path
+            for name in set(sys.modules) - modules:
+                del sys.modules[name]
+
+        out.seek(0)
+        err.seek(0)
+        return (
+            ret,
+            out.read().decode(errors="replace"),
+            err.read().decode(errors="replace"),
+        )
+
+
+def main():
+    # Responses go to the original stdout; fd 1 is handed to pytest runs
+    responses = os.fdopen(os.dup(1), "wb")
+    while True:
+        try:
+            cwd, args = pickle.load(sys.stdin.buffer)
+        except EOFError:
+            return
+        pickle.dump(_run(cwd, args), responses)
+        responses.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,14 +2,75 @@
 Shared fixtures for pytest-difftest test suite.
 
 Uses pytester for integration tests that run pytest in subprocess isolation.
+
+Every fixture works in per-test tmp dirs (or per-worker session tmp dirs), so
+the suite is safe to run with ``pytest -n auto``.
 """
 
+import os
+import pickle
+import shutil
+import sqlite3
+import subprocess
+import sys
+import time
+from pathlib import Path
+
 import pytest
 
 # Enable pytester fixture
 pytest_plugins = ["pytester"]
 
 
+@pytest.fixture(scope="session", autouse=True)
+def _subprocess_env():
+    """Environment shared by pytester subprocesses and xdist workers.
+
+    - SQLite fsyncs are turned off: test databases are throwaway, so
+      durability is not needed.
+    - Bytecode writes are skipped: every pytester project lives in a fresh
+      tmp dir, so its ``.pyc`` files would never be reused.
+    """
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("PYTEST_DIFFTEST_SQLITE_SYNCHRONOUS", "OFF")
+        mp.setenv("PYTHONDONTWRITEBYTECODE", "1")
+        yield
+
+
+@pytest.fixture(scope="session")
+def help_output(tmp_path_factory):
+    """``pytest --help`` output, captured once per session.
+
+    The help text only depends on the installed plugins, so every test that
+    inspects it can share a single subprocess.
+    """
+    cwd = tmp_path_factory.mktemp("help")
+    return subprocess.check_output([sys.executable, "-m", "pytest", "--help"], cwd=cwd, text=True)
+
+
+SAMPLE_PROJECT_FILES = {
+    "mylib/__init__.py": "",
+    "mylib/calculator.py": (
+        "def add(a, b):\n    return a + b\n\ndef multiply(a, b):\n    return a * b\n"
+    ),
+    "tests/__init__.py": "",
+    "tests/test_calc.py": (
+        "import sys\n"
+        "sys.path.insert(0, str(__import__('pathlib').Path(__file__).parent.parent))\n"
+        "from mylib.calculator import add, multiply\n"
+        "\n"
+        "def test_add():\n"
+        "    assert add(1, 2) == 3\n"
+        "\n"
+        "def test_multiply():\n"
+        "    assert multiply(2, 3) == 6\n"
+    ),
+}
+
+# Database location relative to the project rootdir
+DB_RELPATH = Path(".pytest_cache") / "pytest-difftest" / "pytest_difftest.db"
+
+
 @pytest.fixture
 def sample_project(pytester):
     """Create a simple project with a calculator module and tests.
@@ -18,29 +79,44 @@ def sample_project(pytester):
         mylib/calculator.py  - add(), multiply()
         tests/test_calc.py   - test_add(), test_multiply()
     """
-    pytester.makepyfile(
-        **{
-            "mylib/__init__.py": "",
-            "mylib/calculator.py": (
-                "def add(a, b):\n    return a + b\n\ndef multiply(a, b):\n    return a * b\n"
-            ),
-            "tests/__init__.py": "",
-            "tests/test_calc.py": (
-                "import sys\n"
-                "sys.path.insert(0, str(__import__('pathlib').Path(__file__).parent.parent))\n"
-                "from mylib.calculator import add, multiply\n"
-                "\n"
-                "def test_add():\n"
-                "    assert add(1, 2) == 3\n"
-                "\n"
-                "def test_multiply():\n"
-                "    assert multiply(2, 3) == 6\n"
-            ),
-        }
-    )
+    pytester.makepyfile(**SAMPLE_PROJECT_FILES)
     return pytester
 
 
+# Edited calculator.py written by modify_calculator
+_MODIFIED_CALCULATOR = (
+    b"def add(a, b):\n    return a + b + 0  # modified\n\ndef multiply(a, b):\n    return a * b\n"
+)
+
+
+def _bump_mtime(path):
+    """Push *path*'s mtime one second forward.
+
+    Guarantees the edit is seen as newer than the baseline even when both
+    writes land in the same filesystem timestamp tick, without sleeping.
+    """
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+@pytest.fixture
+def bump_mtime():
+    """Return ``bump_mtime(path)``, marking a just-written file as changed."""
+    return _bump_mtime
+
+
+@pytest.fixture
+def modify_calculator():
+    """Return ``modify_calculator(project)``, editing sample_project's add()."""
+
+    def modify(project):
+        calc = project.path / "mylib" / "calculator.py"
+        calc.write_bytes(_MODIFIED_CALCULATOR)
+        _bump_mtime(calc)
+
+    return modify
+
+
 @pytest.fixture
 def multi_module_project(pytester):
     """Create a project with two independent modules and separate test files.
@@ -88,9 +164,181 @@ def multi_module_project(pytester):
     return pytester
 
 
+# Canonical modules fingerprinted once per session by shared_fingerprints
+SHARED_SOURCES = {
+    "foo.py": "def foo():\n    return 'foo'\n",
+    "bar.py": "def bar():\n    return 'bar'\n",
+}
+
+
+@pytest.fixture(scope="session")
+def shared_fingerprints(tmp_path_factory):
+    """``{name: (path, Fingerprint)}`` for ``SHARED_SOURCES``, in one batch.
+
+    Fingerprints only depend on file contents, so tests that just need *a*
+    fingerprint to store can share these. Tests that edit the file must
+    write their own.
+    """
+    from pytest_difftest._core import calculate_fingerprints_batch
+
+    src = tmp_path_factory.mktemp("shared_src")
+    paths = [src / name for name in SHARED_SOURCES]
+    for path in paths:
+        path.write_text(SHARED_SOURCES[path.name])
+    fingerprints = calculate_fingerprints_batch(paths)
+    return {path.name: (path, fp) for path, fp in zip(paths, fingerprints)}
+
+
+@pytest.fixture(scope="session")
+def shared_foo_fp(shared_fingerprints):
+    """``(path, Fingerprint)`` for the shared foo.py."""
+    return shared_fingerprints["foo.py"]
+
+
+@pytest.fixture(scope="session")
+def shared_bar_fp(shared_fingerprints):
+    """``(path, Fingerprint)`` for the shared bar.py."""
+    return shared_fingerprints["bar.py"]
+
+
+@pytest.fixture(scope="session")
+def empty_db_template(tmp_path_factory):
+    """Path to an empty database with the schema applied, built once."""
+    from pytest_difftest._core import PytestDiffDatabase
+
+    work = tmp_path_factory.mktemp("empty_db")
+    db = PytestDiffDatabase(work / "build.db")
+    db.close()
+
+    # Fold the WAL into a single file so a plain copy is a complete database
+    template = work / "template.db"
+    src = sqlite3.connect(work / "build.db")
+    dst = sqlite3.connect(template)
+    try:
+        src.backup(dst)
+    finally:
+        dst.close()
+        src.close()
+    return template
+
+
+@pytest.fixture
+def fresh_db(tmp_path, empty_db_template):
+    """Path to a per-test copy of ``empty_db_template`` at tmp_path/test.db."""
+    db_path = tmp_path / "test.db"
+    shutil.copyfile(empty_db_template, db_path)
+    return db_path
+
+
 @pytest.fixture
-def baselined_project(sample_project):
-    """Run --diff-baseline on a sample project and return it ready for --diff runs."""
-    result = sample_project.runpytest_subprocess("--diff-baseline", "-v")
-    result.assert_outcomes(passed=2)
+def make_baseline_db(empty_db_template):
+    """Return ``make_baseline_db(path, *sources, metadata=None)``, writing a baseline DB.
+
+    Each source is either a Python file to fingerprint or a precomputed
+    Fingerprint (e.g. from ``shared_foo_fp``); all of them are saved in a
+    single transaction. ``metadata`` key/value pairs are written afterwards.
+
+    Starts from a copy of ``empty_db_template``, so only the fingerprint rows
+    are written instead of the whole schema.
+    """
+    from pytest_difftest._core import PytestDiffDatabase, calculate_fingerprint
+
+    def make(path, *sources, metadata=None):
+        fingerprints = [
+            calculate_fingerprint(source) if isinstance(source, Path) else source
+            for source in sources
+        ]
+        shutil.copyfile(empty_db_template, path)
+        with PytestDiffDatabase(path) as db:
+            db.save_baseline_fingerprints(fingerprints)
+            for key, value in (metadata or {}).items():
+                db.set_metadata(key, value)
+        return path
+
+    return make
+
+
+@pytest.fixture(scope="session")
+def sample_baseline_db(tmp_path_factory):
+    """Bytes of a --diff-baseline database built once for the sample project.
+
+    Fingerprints are stored with paths relative to the rootdir, so the same
+    database is valid in any copy of the sample project.
+    """
+    project = tmp_path_factory.mktemp("sample_baseline")
+    for rel_path, content in SAMPLE_PROJECT_FILES.items():
+        path = project / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+
+    result = subprocess.run(
+        [sys.executable, "-m", "pytest", "--diff-baseline"],
+        cwd=project,
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
+
+    # Fold any leftover WAL content into a single self-contained file
+    snapshot = project / "snapshot.db"
+    src = sqlite3.connect(project / DB_RELPATH)
+    dst = sqlite3.connect(snapshot)
+    try:
+        src.backup(dst)
+    finally:
+        dst.close()
+        src.close()
+    return snapshot.read_bytes()
+
+
+@pytest.fixture
+def baselined_project(sample_project, sample_baseline_db):
+    """Sample project with a --diff-baseline database already in place."""
+    db_path = sample_project.path / DB_RELPATH
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    db_path.write_bytes(sample_baseline_db)
     return sample_project
+
+
+class PytestServer:
+    """Client for the long-lived pytest process in ``_pytest_server.py``.
+
+    Runs pytest without paying interpreter startup and plugin import on every
+    call. Use it for runs that don't depend on a fresh controller process;
+    xdist workers are still started as new interpreters.
+    """
+
+    def __init__(self) -> None:
+        env = dict(os.environ)
+        env.pop("PYTEST_ADDOPTS", None)
+        self._proc = subprocess.Popen(
+            [sys.executable, "-u", str(Path(__file__).with_name("_pytest_server.py"))],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            env=env,
+        )
+
+    def run(self, project, *args):
+        """Run pytest with *args* in *project*'s directory."""
+        assert self._proc.stdin is not None and self._proc.stdout is not None
+        start = time.time()
+        pickle.dump((str(project.path), list(args)), self._proc.stdin)
+        self._proc.stdin.flush()
+        try:
+            ret, out, err = pickle.load(self._proc.stdout)
+        except EOFError:
+            raise RuntimeError(f"pytest server exited with code {self._proc.wait()}") from None
+        return pytest.RunResult(ret, out.splitlines(), err.splitlines(), time.time() - start)
+
+    def close(self) -> None:
+        assert self._proc.stdin is not None
+        self._proc.stdin.close()
+        self._proc.wait(timeout=30)
+
+
+@pytest.fixture(scope="session")
+def persistent_pytest(_subprocess_env):
+    """Session-wide ``PytestServer``, started on first use."""
+    server = PytestServer()
+    yield server
+    server.close()
@@ -3,15 +3,14 @@ Test baseline fingerprint functionality and revert scenarios
 """
 
 import tempfile
+import time
 from pathlib import Path
 
+from pytest_difftest import _core
+
 
 def test_baseline_revert_scenario():
     """Test that reverting changes is properly detected with baseline"""
-    import time
-
-    from pytest_difftest import _core
-
     with tempfile.TemporaryDirectory() as tmpdir:
         tmpdir = Path(tmpdir)
 
@@ -56,8 +55,6 @@ def test_baseline_revert_scenario():
 
 def test_save_baseline_function():
     """Test the save_baseline function directly"""
-    from pytest_difftest import _core
-
     with tempfile.TemporaryDirectory() as tmpdir:
         tmpdir = Path(tmpdir)
 
@@ -75,15 +72,13 @@ def test_save_baseline_function():
         assert count == 3, f"Should save baseline for 3 files, got {count}"
 
         # Open database and verify baselines were saved
-        db = _core.PytestDiffDatabase(str(db_path))
+        db = _core.PytestDiffDatabase(db_path)
         stats = db.get_stats()
         assert stats["baseline_count"] == 3, "Should have 3 baselines in database"
 
 
 def test_baseline_detects_no_change_on_revert():
     """Test that detect_changes returns no changes after reverting to baseline"""
-    from pytest_difftest import _core
-
     with tempfile.TemporaryDirectory() as tmpdir:
         tmpdir = Path(tmpdir)
 
@@ -103,8 +98,6 @@ def test_baseline_detects_no_change_on_revert():
         assert not changes.has_changes(), "No changes should be detected initially"
 
         # Modify the file
-        import time
-
         time.sleep(0.01)  # Ensure mtime changes
         module.write_text("def add(a, b):\n    return a + b + 1\n")
 
@@ -27,36 +27,26 @@ def test_baseline_creates_database(sample_project):
     assert db_path.exists(), f"Database not found at {db_path}"
 
 
-def test_baseline_idempotent(sample_project):
+def test_baseline_idempotent(sample_project, persistent_pytest):
     """Running baseline twice: second run is incremental and skips all tests."""
-    result1 = sample_project.runpytest_subprocess("--diff-baseline", "-v")
+    result1 = persistent_pytest.run(sample_project, "--diff-baseline", "-v")
+    result2 = persistent_pytest.run(sample_project, "--diff-baseline", "-v")
     result1.assert_outcomes(passed=2)
 
-    result2 = sample_project.runpytest_subprocess("--diff-baseline", "-v")
     # No changes since first baseline — incremental mode skips all tests
     result2.assert_outcomes()
     result2.stdout.fnmatch_lines(["*No changes detected*"])
     result2.stdout.fnmatch_lines(["*Baseline saved for * files*"])
 
 
-def test_baseline_incremental_runs_affected_tests(sample_project):
+def test_baseline_incremental_runs_affected_tests(sample_project, modify_calculator):
     """Incremental baseline only runs tests affected by changes."""
-    import time
-
     # First baseline: run all tests
     result1 = sample_project.runpytest_subprocess("--diff-baseline", "-v")
     result1.assert_outcomes(passed=2)
 
     # Modify source file
-    time.sleep(0.01)
-    calc = sample_project.path / "mylib" / "calculator.py"
-    calc.write_text(
-        "def add(a, b):\n"
-        "    return a + b + 0  # modified\n"
-        "\n"
-        "def multiply(a, b):\n"
-        "    return a * b\n"
-    )
+    modify_calculator(sample_project)
 
     # Second baseline: incremental, only affected tests run
     result2 = sample_project.runpytest_subprocess("--diff-baseline", "-v")
@@ -64,14 +54,12 @@ def test_baseline_incremental_runs_affected_tests(sample_project):
     result2.stdout.fnmatch_lines(["*Baseline saved for * files*"])
 
 
-def test_baseline_force_runs_all_tests(sample_project):
+def test_baseline_force_runs_all_tests(sample_project, persistent_pytest):
     """--diff-force with --diff-baseline always runs all tests."""
-    # First baseline
-    result1 = sample_project.runpytest_subprocess("--diff-baseline", "-v")
-    result1.assert_outcomes(passed=2)
-
+    result1 = persistent_pytest.run(sample_project, "--diff-baseline", "-v")
     # Second baseline with --diff-force: runs all tests even though nothing changed
-    result2 = sample_project.runpytest_subprocess("--diff-baseline", "--diff-force", "-v")
+    result2 = persistent_pytest.run(sample_project, "--diff-baseline", "--diff-force", "-v")
+    result1.assert_outcomes(passed=2)
     result2.assert_outcomes(passed=2)
     result2.stdout.no_fnmatch_line("*deselected*")
     result2.stdout.fnmatch_lines(["*Baseline saved for * files*"])
@@ -103,14 +91,14 @@ def project_with_failing_test(pytester):
     return pytester
 
 
-def test_failed_tests_not_recorded_in_baseline(project_with_failing_test):
+def test_failed_tests_not_recorded_in_baseline(project_with_failing_test, persistent_pytest):
     """Failed tests are not recorded in baseline, so --diff re-selects them."""
-    # Baseline with one passing and one failing test
-    result1 = project_with_failing_test.runpytest_subprocess("--diff-baseline", "-v")
+    # Baseline with one passing and one failing test, then --diff
+    result1 = persistent_pytest.run(project_with_failing_test, "--diff-baseline", "-v")
+    result2 = persistent_pytest.run(project_with_failing_test, "--diff", "-v")
     result1.assert_outcomes(passed=1, failed=1)
 
     # --diff should still select the failing test since it was not recorded,
     # but the passing test should be deselected (no code changes)
-    result2 = project_with_failing_test.runpytest_subprocess("--diff", "-v")
     result2.assert_outcomes(failed=1)
     result2.stdout.fnmatch_lines(["*1 deselected*"])
@@ -2,6 +2,8 @@
 Tests for edge cases and robustness.
 """
 
+import pytest
+
 
 def test_diff_with_empty_database(pytester):
     """--diff with no prior baseline doesn't crash."""
@@ -11,29 +13,51 @@ def test_diff_with_empty_database(pytester):
     assert result.ret in (0, 5)
 
 
-def test_syntax_error_in_source(baselined_project):
-    """Source file with syntax error doesn't crash plugin."""
-    import time
+def _write_source(rel_path, content):
+    """Return a mutation that writes *content* to *rel_path* in the project."""
 
-    time.sleep(0.01)
-    calc = baselined_project.path / "mylib" / "calculator.py"
-    calc.write_text("def broken(\n")  # syntax error
+    def mutate(root, bump_mtime):
+        (root / rel_path).write_text(content)
+        bump_mtime(root / rel_path)
+
+    return mutate
 
-    result = baselined_project.runpytest_subprocess("--diff", "-v")
-    # Plugin should handle gracefully — test collection may fail but plugin shouldn't panic
-    assert result.ret in (0, 1, 2, 4, 5)
 
+def _delete_source(rel_path):
+    """Return a mutation that removes *rel_path* from the project."""
 
-def test_empty_python_file(baselined_project):
-    """Empty .py files don't crash fingerprinting."""
-    import time
+    def mutate(root, bump_mtime):
+        (root / rel_path).unlink()
 
-    time.sleep(0.01)
-    empty = baselined_project.path / "mylib" / "empty.py"
-    empty.write_text("")
+    return mutate
+
+
+@pytest.mark.parametrize(
+    ("mutate", "allowed_exit_codes"),
+    [
+        # Test collection may fail on import, but the plugin shouldn't panic
+        pytest.param(
+            _write_source("mylib/calculator.py", "def broken(\n"),
+            {0, 1, 2, 4, 5},
+            id="syntax-error",
+        ),
+        pytest.param(_write_source("mylib/empty.py", ""), {0, 5}, id="empty-file"),
+        # New file may or may not trigger change detection
+        pytest.param(
+            _write_source("mylib/new_module.py", "def new_func():\n    return 42\n"),
+            {0, 5},
+            id="new-file",
+        ),
+        # Deleted files are handled gracefully, test import may still error
+        pytest.param(_delete_source("mylib/calculator.py"), {0, 1, 2, 5}, id="deleted-file"),
+    ],
+)
+def test_source_mutation_doesnt_crash(baselined_project, bump_mtime, mutate, allowed_exit_codes):
+    """--diff survives unusual source changes made after the baseline."""
+    mutate(baselined_project.path, bump_mtime)
 
     result = baselined_project.runpytest_subprocess("--diff", "-v")
-    assert result.ret in (0, 5)
+    assert result.ret in allowed_exit_codes
 
 
 def test_database_corruption_recovery(pytester):
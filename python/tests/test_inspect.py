@@ -4,11 +4,9 @@ from pytest_difftest import _core
 from pytest_difftest.cli import inspect_database
 
 
-def test_inspect_summary_empty_db(tmp_path, capsys):
+def test_inspect_summary_empty_db(fresh_db, capsys):
     """Summary on an empty database shows zero counts."""
-    db_path = str(tmp_path / "test.db")
-    db = _core.PytestDiffDatabase(db_path)
-    db.close()
+    db_path = str(fresh_db)
 
     rc = inspect_database(db_path, test=None, file=None)
     assert rc == 0
@@ -22,10 +20,9 @@ def test_inspect_summary_empty_db(tmp_path, capsys):
 def test_inspect_summary_with_metadata(tmp_path, capsys):
     """Summary shows commit and scope when metadata is present."""
     db_path = str(tmp_path / "test.db")
-    db = _core.PytestDiffDatabase(db_path)
-    db.set_metadata("baseline_commit", "abc123def456")
-    db.set_metadata("baseline_scope", '["tests/"]')
-    db.close()
+    with _core.PytestDiffDatabase(db_path) as db:
+        db.set_metadata("baseline_commit", "abc123def456")
+        db.set_metadata("baseline_scope", '["tests/"]')
 
     rc = inspect_database(db_path, test=None, file=None)
     assert rc == 0
@@ -38,11 +35,9 @@ def test_inspect_summary_with_metadata(tmp_path, capsys):
 def test_inspect_test_dependencies(tmp_path, capsys):
     """--test shows files the test depends on."""
     db_path = str(tmp_path / "test.db")
-    db = _core.PytestDiffDatabase(db_path)
-
     fp = _core.calculate_fingerprint(_create_py_file(tmp_path, "module_a.py", "x = 1\n"))
-    db.save_test_execution("tests/test_foo.py::test_bar", [fp], 0.1, False)
-    db.close()
+    with _core.PytestDiffDatabase(db_path) as db:
+        db.save_test_execution("tests/test_foo.py::test_bar", [fp], 0.1, False)
 
     rc = inspect_database(db_path, test="tests/test_foo.py::test_bar", file=None)
     assert rc == 0
@@ -55,13 +50,11 @@ def test_inspect_test_dependencies(tmp_path, capsys):
 def test_inspect_file_dependents(tmp_path, capsys):
     """--file shows tests that depend on a file."""
     db_path = str(tmp_path / "test.db")
-    db = _core.PytestDiffDatabase(db_path)
-
     py_file = _create_py_file(tmp_path, "src/models.py", "class Model:\n    pass\n")
     fp = _core.calculate_fingerprint(py_file)
-    db.save_test_execution("tests/test_models.py::test_create", [fp], 0.2, False)
-    db.save_test_execution("tests/test_models.py::test_delete", [fp], 0.3, False)
-    db.close()
+    with _core.PytestDiffDatabase(db_path) as db:
+        db.save_test_execution("tests/test_models.py::test_create", [fp], 0.2, False)
+        db.save_test_execution("tests/test_models.py::test_delete", [fp], 0.3, False)
 
     rc = inspect_database(db_path, test=None, file=fp.filename)
     assert rc == 0
@@ -72,11 +65,9 @@ def test_inspect_file_dependents(tmp_path, capsys):
     assert "test_delete" in out
 
 
-def test_inspect_nonexistent_test(tmp_path, capsys):
+def test_inspect_nonexistent_test(fresh_db, capsys):
     """--test with unknown test name shows 0 results, no error."""
-    db_path = str(tmp_path / "test.db")
-    db = _core.PytestDiffDatabase(db_path)
-    db.close()
+    db_path = str(fresh_db)
 
     rc = inspect_database(db_path, test="nonexistent::test", file=None)
     assert rc == 0
@@ -85,11 +76,9 @@ def test_inspect_nonexistent_test(tmp_path, capsys):
     assert "Depends on 0 file(s)" in out
 
 
-def test_inspect_nonexistent_file(tmp_path, capsys):
+def test_inspect_nonexistent_file(fresh_db, capsys):
     """--file with unknown filename shows 0 results, no error."""
-    db_path = str(tmp_path / "test.db")
-    db = _core.PytestDiffDatabase(db_path)
-    db.close()
+    db_path = str(fresh_db)
 
     rc = inspect_database(db_path, test=None, file="nonexistent.py")
     assert rc == 0
@@ -4,11 +4,9 @@ Tests for plugin registration, CLI/ini options, and precedence.
 
 
 def test_plugin_not_registered_without_flags(pytester):
-    """No pytest-difftest output when neither --diff nor --diff-baseline passed."""
-    pytester.makepyfile("def test_noop(): pass")
-    result = pytester.runpytest_subprocess("-v")
-    result.assert_outcomes(passed=1)
-    result.stdout.no_fnmatch_line("*pytest-difftest: Using database*")
+    """Plugin is not registered when neither --diff nor --diff-baseline passed."""
+    config = pytester.parseconfigure("-v")
+    assert config.pluginmanager.get_plugin("pytest_difftest") is None
 
 
 def test_plugin_registered_with_diff_flag(pytester):
@@ -25,18 +23,16 @@ def test_plugin_registered_with_baseline_flag(pytester):
     result.stdout.fnmatch_lines(["*pytest-difftest*Baseline saved*"])
 
 
-def test_help_shows_all_options(pytester):
+def test_help_shows_all_options(help_output):
     """All diff options appear in --help output."""
-    result = pytester.runpytest_subprocess("--help")
-    result.stdout.fnmatch_lines(
-        [
-            "*--diff *",
-            "*--diff-baseline*",
-            "*--diff-v*",
-            "*--diff-batch-size*",
-            "*--diff-cache-size*",
-        ]
-    )
+    for option in (
+        "--diff ",
+        "--diff-baseline",
+        "--diff-v",
+        "--diff-batch-size",
+        "--diff-cache-size",
+    ):
+        assert option in help_output
 
 
 def test_verbose_flag_produces_timing_output(sample_project):
@@ -120,13 +116,9 @@ def test_scope_mismatch_diff_warns_only(sample_project):
     result.stdout.fnmatch_lines(["*Scope mismatch*Some tests may not be selected*"])
 
 
-def test_subscope_no_warning(sample_project):
+def test_subscope_no_warning(baselined_project):
     """When --diff scope is a subset of baseline scope, no warning is shown."""
-    # Build baseline at rootdir (broad scope)
-    result = sample_project.runpytest_subprocess("--diff-baseline", "-v")
-    result.assert_outcomes(passed=2)
-    result.stdout.fnmatch_lines(["*Baseline saved*"])
-
+    # Baseline was built at rootdir (broad scope)
     # Run --diff scoped to tests/ (narrower) — no mismatch, baseline covers it
-    result = sample_project.runpytest_subprocess("--diff", "tests/", "-v")
+    result = baselined_project.runpytest_subprocess("--diff", "tests/", "-v")
     result.stdout.no_fnmatch_line("*Scope mismatch*")
@@ -4,9 +4,20 @@ Direct tests for the _core Rust module (fingerprint, cache, database).
 These tests use tmp_path (standard pytest) instead of pytester.
 """
 
+import pytest
+
 from pytest_difftest import _core
 
 
+def _synthetic_fp():
+    """A Fingerprint built without reading or hashing any file.
+
+    For tests that only store and read back filename/checksums; the real
+    hashing path is covered by test_calculate_fingerprint.
+    """
+    return _core.Fingerprint("src/module.py", [123], "0" * 64, 0.0)
+
+
 def test_parse_module_returns_blocks():
     """parse_module extracts function/class blocks with correct names."""
     source = "def foo():\n    pass\n\nclass Bar:\n    def method(self):\n        pass\n"
@@ -23,7 +34,7 @@ def test_calculate_fingerprint(tmp_path):
     f = tmp_path / "example.py"
     f.write_text("def hello():\n    return 'world'\n")
 
-    fp = _core.calculate_fingerprint(str(f))
+    fp = _core.calculate_fingerprint(f)
     assert fp.filename == str(f)
     assert isinstance(fp.file_hash, str)
     assert len(fp.file_hash) == 64  # blake3 hex
@@ -32,6 +43,29 @@ def test_calculate_fingerprint(tmp_path):
     assert fp.blocks is not None and len(fp.blocks) > 0
 
 
+def test_calculate_fingerprints_batch(tmp_path):
+    """Batch results match single calls, in input order, relative to project_root."""
+    paths = []
+    for i in range(3):
+        f = tmp_path / f"mod{i}.py"
+        f.write_text(f"def f{i}():\n    return {i}\n")
+        paths.append(str(f))
+
+    fps = _core.calculate_fingerprints_batch(paths, str(tmp_path))
+
+    assert [fp.filename for fp in fps] == ["mod0.py", "mod1.py", "mod2.py"]
+    for path, fp in zip(paths, fps):
+        single = _core.calculate_fingerprint(path, str(tmp_path))
+        assert fp.file_hash == single.file_hash
+        assert fp.checksums == single.checksums
+
+
+def test_calculate_fingerprints_batch_missing_file(tmp_path):
+    """A missing file fails the whole batch."""
+    with pytest.raises(OSError):
+        _core.calculate_fingerprints_batch([str(tmp_path / "missing.py")])
+
+
 def test_fingerprint_cache_hit_miss(tmp_path):
     """Cache reports 0 hits/1 miss on first call, 1 hit on second."""
     f = tmp_path / "cached.py"
@@ -52,39 +86,94 @@ def test_fingerprint_cache_hit_miss(tmp_path):
     assert misses2 == 1
 
 
-def test_fingerprint_cache_eviction(tmp_path):
+def test_calculate_fingerprint_uses_cache(tmp_path):
+    """calculate_fingerprint(cache=...) only reads the file on a cache miss."""
+    f = tmp_path / "module.py"
+    f.write_text("def foo(): pass\n")
+    cache = _core.FingerprintCache()
+
+    first = _core.calculate_fingerprint(f, str(tmp_path), cache)
+    second = _core.calculate_fingerprint(f, str(tmp_path), cache)
+
+    assert cache.stats()[:2] == (1, 1)
+    assert first.filename == second.filename == "module.py"
+    assert first.file_hash == second.file_hash
+
+
+def test_fingerprint_cache_eviction():
     """Cache with max_size=2 evicts when 3 entries added."""
     cache = _core.FingerprintCache(2)
 
     for i in range(3):
-        f = tmp_path / f"mod{i}.py"
-        f.write_text(f"x = {i}\n")
-        cache.get_or_calculate(str(f))
+        fp = _core.Fingerprint(f"mod{i}.py", [i], f"hash{i}", 1.0)
+        cache.insert(f"mod{i}.py", fp)
 
     assert cache.size() == 2
     assert cache.max_size() == 2
 
 
-def test_database_stats_empty(tmp_path):
+def test_database_stats_empty():
     """New DB has test_count=0, file_count=0, baseline_count=0."""
-    db_path = tmp_path / "test.db"
-    db = _core.PytestDiffDatabase(str(db_path))
+    db = _core.PytestDiffDatabase(":memory:")
     stats = db.get_stats()
     assert stats["test_count"] == 0
     assert stats["file_count"] == 0
     assert stats["baseline_count"] == 0
 
 
-def test_detect_changes_no_baseline(tmp_path):
-    """Files with no baseline are detected as new/changed."""
+def test_database_context_manager_closes(tmp_path):
+    """Leaving a with block closes the connection and releases the file."""
     db_path = tmp_path / "test.db"
-    # Create the DB so detect_changes doesn't fail on missing file
-    _core.PytestDiffDatabase(str(db_path))
+    with _core.PytestDiffDatabase(db_path) as db:
+        assert isinstance(db, _core.PytestDiffDatabase)
+        db.set_metadata("baseline_commit", "abc")
+
+    # SQLite removes the WAL and shared-memory files when the last connection closes
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["test.db"]
+    with pytest.raises(RuntimeError, match="Database is closed"):
+        db.get_metadata("baseline_commit")
+    db.close()  # no-op once closed
 
+    with _core.PytestDiffDatabase(db_path) as db:
+        assert db.get_metadata("baseline_commit") == "abc"
+
+
+def test_transaction_commits_or_rolls_back(shared_foo_fp, shared_bar_fp):
+    """transaction() commits on success and rolls back when the block raises."""
+    db = _core.PytestDiffDatabase(":memory:")
+    _, foo_fp = shared_foo_fp
+    _, bar_fp = shared_bar_fp
+
+    with db.transaction():
+        db.save_baseline_fingerprint(foo_fp)
+        db.set_metadata("baseline_commit", "abc")
+
+    with pytest.raises(ValueError), db.transaction():
+        db.save_baseline_fingerprint(bar_fp)
+        raise ValueError("boom")
+
+    assert db.get_stats()["baseline_count"] == 1
+    assert db.get_metadata("baseline_commit") == "abc"
+    assert db.get_baseline_fingerprint(bar_fp.filename) is None
+
+
+def test_save_baseline_fingerprints_bulk(shared_foo_fp, shared_bar_fp):
+    """save_baseline_fingerprints stores every fingerprint in one call."""
+    db = _core.PytestDiffDatabase(":memory:")
+    fps = [shared_foo_fp[1], shared_bar_fp[1]]
+
+    assert db.save_baseline_fingerprints(fps) == 2
+    assert db.get_stats()["baseline_count"] == 2
+    for fp in fps:
+        assert db.get_baseline_fingerprint(fp.filename).file_hash == fp.file_hash
+
+
+def test_detect_changes_no_baseline(tmp_path, fresh_db):
+    """Files with no baseline are detected as new/changed."""
     f = tmp_path / "module.py"
     f.write_text("def foo(): pass\n")
 
-    changes = _core.detect_changes(str(db_path), str(tmp_path), [str(tmp_path)])
+    changes = _core.detect_changes(str(fresh_db), str(tmp_path), [str(tmp_path)])
     # New files (no baseline) should be detected as changed
     assert changes.has_changes()
     assert len(changes.modified) == 1
@@ -93,20 +182,14 @@ def test_detect_changes_no_baseline(tmp_path):
 def test_import_baseline_returns_import_result(tmp_path):
     """import_baseline_from returns ImportResult with both counts."""
     source_path = tmp_path / "source.db"
-    source_db = _core.PytestDiffDatabase(str(source_path))
+    fp = _synthetic_fp()
+    with _core.PytestDiffDatabase(source_path) as source_db:
+        source_db.save_test_execution("test_hello", [fp], 0.1, False)
+        source_db.save_baseline_fingerprint(fp)
 
-    # Create a Python file and save test execution + baseline
-    f = tmp_path / "module.py"
-    f.write_text("def hello():\n    return 'world'\n")
-    fp = _core.calculate_fingerprint(str(f))
-    source_db.save_test_execution("test_hello", [fp], 0.1, False)
-    source_db.save_baseline_fingerprint(fp)
-    source_db.close()
-
-    # Import into target
-    target_path = tmp_path / "target.db"
-    target_db = _core.PytestDiffDatabase(str(target_path))
-    result = target_db.import_baseline_from(str(source_path))
+    # Import into target (in-memory: only the source is read back from disk)
+    target_db = _core.PytestDiffDatabase(":memory:")
+    result = target_db.import_baseline_from(source_path)
 
     assert isinstance(result, _core.ImportResult)
     assert result.baseline_count == 1
@@ -116,37 +199,29 @@ def test_import_baseline_returns_import_result(tmp_path):
 def test_merge_baseline_returns_import_result(tmp_path):
     """merge_baseline_from returns ImportResult with both counts."""
     source_path = tmp_path / "source.db"
-    source_db = _core.PytestDiffDatabase(str(source_path))
-
-    f = tmp_path / "module.py"
-    f.write_text("def hello():\n    return 'world'\n")
-    fp = _core.calculate_fingerprint(str(f))
-    source_db.save_test_execution("test_hello", [fp], 0.1, False)
-    source_db.save_baseline_fingerprint(fp)
-    source_db.close()
+    fp = _synthetic_fp()
+    with _core.PytestDiffDatabase(source_path) as source_db:
+        source_db.save_test_execution("test_hello", [fp], 0.1, False)
+        source_db.save_baseline_fingerprint(fp)
 
-    # Merge into target
-    target_path = tmp_path / "target.db"
-    target_db = _core.PytestDiffDatabase(str(target_path))
-    result = target_db.merge_baseline_from(str(source_path))
+    # Merge into target (in-memory: only the source is read back from disk)
+    target_db = _core.PytestDiffDatabase(":memory:")
+    result = target_db.merge_baseline_from(source_path)
 
     assert isinstance(result, _core.ImportResult)
     assert result.baseline_count == 1
     assert result.test_execution_count == 1
 
 
-def test_detect_changes_returns_relative_paths(tmp_path):
+def test_detect_changes_returns_relative_paths(tmp_path, fresh_db):
     """detect_changes returns paths relative to project_root, not absolute."""
-    db_path = tmp_path / "test.db"
-    _core.PytestDiffDatabase(str(db_path))
-
     # Create a subdirectory with a Python file
     subdir = tmp_path / "src"
     subdir.mkdir()
     f = subdir / "module.py"
     f.write_text("def foo(): pass\n")
 
-    changes = _core.detect_changes(str(db_path), str(tmp_path), [str(tmp_path)])
+    changes = _core.detect_changes(str(fresh_db), str(tmp_path), [str(tmp_path)])
     assert changes.has_changes()
     # All paths should be relative (not starting with /)
     for path in changes.modified:
@@ -168,8 +243,8 @@ def test_save_baseline_stores_relative_paths(tmp_path):
     _core.save_baseline(str(db_path), str(tmp_path), False, [str(tmp_path)])
 
     # Check that the stored baseline uses relative path
-    db = _core.PytestDiffDatabase(str(db_path))
-    fp = db.get_baseline_fingerprint("src/module.py")
+    with _core.PytestDiffDatabase(db_path) as db:
+        fp = db.get_baseline_fingerprint("src/module.py")
     assert fp is not None, "Baseline should be stored with relative path"
     assert fp.filename == "src/module.py"
 
@@ -177,19 +252,14 @@ def test_save_baseline_stores_relative_paths(tmp_path):
 def test_import_copies_test_execution_coverage(tmp_path):
     """Imported test execution data enables get_affected_tests."""
     source_path = tmp_path / "source.db"
-    source_db = _core.PytestDiffDatabase(str(source_path))
-
-    f = tmp_path / "module.py"
-    f.write_text("def hello():\n    return 'world'\n")
-    fp = _core.calculate_fingerprint(str(f))
-    source_db.save_test_execution("test_hello", [fp], 0.1, False)
-    source_db.save_baseline_fingerprint(fp)
-    source_db.close()
-
-    # Import into target
-    target_path = tmp_path / "target.db"
-    target_db = _core.PytestDiffDatabase(str(target_path))
-    target_db.import_baseline_from(str(source_path))
+    fp = _synthetic_fp()
+    with _core.PytestDiffDatabase(source_path) as source_db:
+        source_db.save_test_execution("test_hello", [fp], 0.1, False)
+        source_db.save_baseline_fingerprint(fp)
+
+    # Import into target (in-memory: only the source is read back from disk)
+    target_db = _core.PytestDiffDatabase(":memory:")
+    target_db.import_baseline_from(source_path)
 
     # get_affected_tests should find the imported test
     affected = target_db.get_affected_tests({fp.filename: list(fp.checksums)})
@@ -2,26 +2,35 @@
 
 from __future__ import annotations
 
+import errno
+import logging
+import os
+import shutil
+import time
 from pathlib import Path
+from unittest.mock import MagicMock
 
 import pytest
 
-
-def _create_source_db(db_path: Path, py_file: Path) -> None:
-    """Create a source database with a baseline fingerprint from a Python file."""
-    from pytest_difftest._core import PytestDiffDatabase, calculate_fingerprint
-
-    db = PytestDiffDatabase(str(db_path))
-    db.save_baseline_fingerprint(calculate_fingerprint(str(py_file)))
-    db.close()
+from pytest_difftest._core import PytestDiffDatabase
+from pytest_difftest._storage_ops import _download_single_baseline, parse_remote_url
+from pytest_difftest.cli import merge_databases
+from pytest_difftest.storage.base import (
+    DOWNLOAD_CONCURRENCY_ENV_VAR,
+    MAX_DOWNLOAD_WORKERS,
+    UPLOAD_COMPRESSION_ENV_VAR,
+    ZSTD_MAGIC,
+    StorageAuthenticationError,
+    download_concurrency,
+)
+from pytest_difftest.storage.local import LocalStorage
+from pytest_difftest.storage.s3 import S3Storage, _shared_client
 
 
 class TestLocalStorage:
     """Tests for the local filesystem storage backend."""
 
     def test_upload_download_roundtrip(self, tmp_path: Path) -> None:
-        from pytest_difftest.storage.local import LocalStorage
-
         remote_dir = tmp_path / "remote"
         remote_dir.mkdir()
         storage = LocalStorage(f"file://{remote_dir}")
@@ -37,9 +46,57 @@ class TestLocalStorage:
         assert downloaded is True
         assert dest.read_bytes() == b"hello baseline"
 
-    def test_download_not_found(self, tmp_path: Path) -> None:
-        from pytest_difftest.storage.local import LocalStorage
+    def test_copy_falls_back_without_copy_file_range(self, tmp_path: Path, monkeypatch) -> None:
+        def unsupported(*args):
+            raise OSError(errno.EXDEV, "cross-device")
+
+        monkeypatch.setattr(os, "copy_file_range", unsupported, raising=False)
+        remote_dir = tmp_path / "remote"
+        remote_dir.mkdir()
+        storage = LocalStorage(f"file://{remote_dir}")
+
+        local_file = tmp_path / "local.db"
+        local_file.write_bytes(b"fallback baseline" * 1000)
+        storage.upload(local_file, "baseline.db")
+
+        uploaded = remote_dir / "baseline.db"
+        assert uploaded.read_bytes() == local_file.read_bytes()
+        assert uploaded.stat().st_mtime_ns == local_file.stat().st_mtime_ns
+
+    def test_copy_falls_back_when_copy_file_range_stops_short(
+        self, tmp_path: Path, monkeypatch
+    ) -> None:
+        calls = []
+
+        def stops_short(src_fd, dst_fd, count, *args):
+            calls.append(count)
+            if len(calls) > 1:
+                return 0
+            return os.write(dst_fd, os.read(src_fd, 1000))
+
+        monkeypatch.setattr(os, "copy_file_range", stops_short, raising=False)
+        remote_dir = tmp_path / "remote"
+        remote_dir.mkdir()
+        storage = LocalStorage(f"file://{remote_dir}")
+
+        local_file = tmp_path / "local.db"
+        local_file.write_bytes(b"short baseline" * 1000)
+        storage.upload(local_file, "baseline.db")
+
+        assert len(calls) == 2
+        uploaded = remote_dir / "baseline.db"
+        assert uploaded.read_bytes() == local_file.read_bytes()
 
+    def test_upload_onto_itself_keeps_data(self, tmp_path: Path) -> None:
+        local_file = tmp_path / "baseline.db"
+        local_file.write_bytes(b"baseline data")
+
+        storage = LocalStorage(f"file://{tmp_path}")
+        with pytest.raises(shutil.SameFileError):
+            storage.upload(local_file, "baseline.db")
+        assert local_file.read_bytes() == b"baseline data"
+
+    def test_download_not_found(self, tmp_path: Path) -> None:
         remote_dir = tmp_path / "remote"
         remote_dir.mkdir()
         storage = LocalStorage(f"file://{remote_dir}")
@@ -48,8 +105,6 @@ class TestLocalStorage:
             storage.download("missing.db", tmp_path / "out.db")
 
     def test_download_cache_hit(self, tmp_path: Path) -> None:
-        from pytest_difftest.storage.local import LocalStorage
-
         remote_dir = tmp_path / "remote"
         remote_dir.mkdir()
         storage = LocalStorage(f"file://{remote_dir}")
@@ -66,29 +121,69 @@ class TestLocalStorage:
         # Second download with same file already present: returns False (cache hit)
         assert storage.download("baseline.db", dest) is False
 
+    def test_download_refreshes_on_size_or_mtime_change(self, tmp_path: Path) -> None:
+        remote_dir = tmp_path / "remote"
+        remote_dir.mkdir()
+        storage = LocalStorage(f"file://{remote_dir}")
+        remote = remote_dir / "baseline.db"
+        remote.write_bytes(b"data")
+
+        dest = tmp_path / "downloaded.db"
+        assert storage.download("baseline.db", dest) is True
+
+        # Same mtime, different size: re-downloaded
+        mtime_ns = remote.stat().st_mtime_ns
+        remote.write_bytes(b"new data")
+        os.utime(remote, ns=(mtime_ns, mtime_ns))
+        assert storage.download("baseline.db", dest) is True
+        assert dest.read_bytes() == b"new data"
+
+        # Same size, older mtime (e.g. restored remote): re-downloaded
+        remote.write_bytes(b"old data")
+        os.utime(remote, ns=(mtime_ns - 10**9, mtime_ns - 10**9))
+        assert storage.download("baseline.db", dest) is True
+        assert dest.read_bytes() == b"old data"
+
 
 class TestS3Storage:
     """Tests for the S3 storage backend using moto."""
 
-    @pytest.fixture(autouse=True)
-    def _require_moto(self) -> None:
+    @pytest.fixture(scope="class")
+    def s3_client(self):
+        """Mocked S3 client with a test bucket, shared by this class.
+
+        Entering ``mock_aws`` and building a boto3 client (which loads the
+        botocore service model) are the slow parts, so both happen once per
+        class; ``s3_storage`` empties the bucket between tests. The mock is
+        scoped to this class so later tests never run against it. The
+        connection pool is sized like the production client so
+        ``download_all`` threads don't queue.
+        """
         pytest.importorskip("moto")
-
-    @pytest.fixture()
-    def s3_storage(self, tmp_path: Path):
         import boto3
+        from botocore.config import Config
         from moto import mock_aws
 
-        from pytest_difftest.storage.s3 import S3Storage
-
         with mock_aws():
-            client = boto3.client("s3", region_name="us-east-1")
+            client = boto3.session.Session().client(
+                "s3",
+                region_name="us-east-1",
+                config=Config(max_pool_connections=MAX_DOWNLOAD_WORKERS),
+            )
             client.create_bucket(Bucket="test-bucket")
+            yield client
 
-            storage = S3Storage("s3://test-bucket/prefix/")
-            # Override the lazily-created client with the mock one
-            storage._client = client
-            yield storage
+    @pytest.fixture()
+    def s3_storage(self, s3_client):
+        storage = S3Storage("s3://test-bucket/prefix/")
+        # Override the lazily-created client with the mock one
+        storage._client = s3_client
+        yield storage
+
+        listed = s3_client.list_objects_v2(Bucket="test-bucket", Prefix="prefix/")
+        objects = [{"Key": obj["Key"]} for obj in listed.get("Contents", [])]
+        if objects:
+            s3_client.delete_objects(Bucket="test-bucket", Delete={"Objects": objects})
 
     def test_upload_download_roundtrip(self, s3_storage, tmp_path: Path) -> None:
         local_file = tmp_path / "local.db"
@@ -114,6 +209,71 @@ class TestS3Storage:
         assert s3_storage.download("baseline.db", dest) is True
         assert s3_storage.download("baseline.db", dest) is False
 
+    def test_large_baseline_uploaded_plain_by_default(
+        self, s3_storage, s3_client, tmp_path: Path, monkeypatch
+    ) -> None:
+        monkeypatch.delenv(UPLOAD_COMPRESSION_ENV_VAR, raising=False)
+        data = b"SQLite format 3\x00" + b"fingerprint" * 10_000
+        local_file = tmp_path / "local.db"
+        local_file.write_bytes(data)
+        s3_storage.upload(local_file, "baseline.db")
+
+        stored = s3_client.get_object(Bucket="test-bucket", Key="prefix/baseline.db")
+        assert stored["Body"].read() == data
+
+    def test_large_baseline_stored_compressed(
+        self, s3_storage, s3_client, tmp_path: Path, monkeypatch
+    ) -> None:
+        pytest.importorskip("zstandard")
+        monkeypatch.setenv(UPLOAD_COMPRESSION_ENV_VAR, "zstd")
+        data = b"SQLite format 3\x00" + b"fingerprint" * 10_000
+        local_file = tmp_path / "local.db"
+        local_file.write_bytes(data)
+        s3_storage.upload(local_file, "baseline.db")
+
+        stored = s3_client.get_object(Bucket="test-bucket", Key="prefix/baseline.db")
+        body = stored["Body"].read()
+        assert body.startswith(ZSTD_MAGIC)
+        assert len(body) < len(data)
+
+        dest = tmp_path / "downloaded.db"
+        assert s3_storage.download("baseline.db", dest) is True
+        assert dest.read_bytes() == data
+
+        (tmp_path / "all").mkdir()
+        assert [p.read_bytes() for p in s3_storage.download_all(tmp_path / "all")] == [data]
+
+
+class TestS3SharedClient:
+    """Tests for reusing one boto3 client across S3Storage instances."""
+
+    @pytest.fixture(autouse=True)
+    def _clear_client_cache(self):
+        _shared_client.cache_clear()
+        yield
+        _shared_client.cache_clear()
+
+    def test_client_shared_between_instances(self, monkeypatch) -> None:
+        pytest.importorskip("boto3")
+        monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+
+        first = S3Storage("s3://bucket-a/").client
+        assert S3Storage("s3://bucket-b/prefix/").client is first
+
+        # A different region gets its own client
+        monkeypatch.setenv("AWS_DEFAULT_REGION", "eu-west-1")
+        assert S3Storage("s3://bucket-a/").client is not first
+
+    def test_new_credentials_get_new_client(self, monkeypatch) -> None:
+        pytest.importorskip("boto3")
+        monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+        monkeypatch.setenv("AWS_ACCESS_KEY_ID", "first-key")
+        monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "secret")
+
+        first = S3Storage("s3://bucket-a/").client
+        monkeypatch.setenv("AWS_ACCESS_KEY_ID", "rotated-key")
+        assert S3Storage("s3://bucket-a/").client is not first
+
 
 class TestS3AuthErrors:
     """Tests for S3 authentication error detection (uses mocks, no moto needed)."""
@@ -123,13 +283,8 @@ class TestS3AuthErrors:
         pytest.importorskip("botocore")
 
     def test_download_access_denied_raises_auth_error(self, tmp_path: Path) -> None:
-        from unittest.mock import MagicMock
-
         from botocore.exceptions import ClientError
 
-        from pytest_difftest.storage.base import StorageAuthenticationError
-        from pytest_difftest.storage.s3 import S3Storage
-
         storage = S3Storage("s3://test-bucket/prefix/")
         mock_client = MagicMock()
         error_response = {
@@ -144,13 +299,8 @@ class TestS3AuthErrors:
             storage.download("baseline.db", tmp_path / "out.db")
 
     def test_list_baselines_access_denied_raises_auth_error(self) -> None:
-        from unittest.mock import MagicMock
-
         from botocore.exceptions import ClientError
 
-        from pytest_difftest.storage.base import StorageAuthenticationError
-        from pytest_difftest.storage.s3 import S3Storage
-
         storage = S3Storage("s3://test-bucket/prefix/")
         mock_client = MagicMock()
         error_response = {
@@ -163,15 +313,17 @@ class TestS3AuthErrors:
         storage._client = mock_client
 
         with pytest.raises(StorageAuthenticationError, match="authentication failed"):
-            storage.list_baselines()
+            storage.list_baselines("baselines/")
+
+        # V2 listing, with the prefix filtered server-side
+        mock_client.get_paginator.assert_called_once_with("list_objects_v2")
+        paginator.paginate.assert_called_once_with(Bucket="test-bucket", Prefix="prefix/baselines/")
 
 
 class TestLocalStorageListAndDownloadAll:
     """Tests for list_baselines and download_all on local storage."""
 
     def test_list_baselines_empty(self, tmp_path: Path) -> None:
-        from pytest_difftest.storage.local import LocalStorage
-
         remote_dir = tmp_path / "remote"
         remote_dir.mkdir()
         storage = LocalStorage(f"file://{remote_dir}")
@@ -179,8 +331,6 @@ class TestLocalStorageListAndDownloadAll:
         assert storage.list_baselines() == []
 
     def test_list_baselines_finds_db_files(self, tmp_path: Path) -> None:
-        from pytest_difftest.storage.local import LocalStorage
-
         remote_dir = tmp_path / "remote"
         remote_dir.mkdir()
         (remote_dir / "baselines").mkdir()
@@ -195,9 +345,26 @@ class TestLocalStorageListAndDownloadAll:
         assert "baselines/job1.db" in keys
         assert "baselines/job2.db" in keys
 
-    def test_download_all(self, tmp_path: Path) -> None:
-        from pytest_difftest.storage.local import LocalStorage
+    def test_list_baselines_recurses_into_subdirectories(self, tmp_path: Path) -> None:
+        remote_dir = tmp_path / "remote"
+        (remote_dir / "baselines" / "nested").mkdir(parents=True)
+        (remote_dir / "baselines" / "top.db").write_bytes(b"db1")
+        (remote_dir / "baselines" / "nested" / "deep.db").write_bytes(b"db2")
+        # Directories are never returned, even with a .db suffix
+        (remote_dir / "baselines" / "dir.db").mkdir()
+
+        storage = LocalStorage(f"file://{remote_dir}")
 
+        assert sorted(storage.list_baselines("baselines/")) == [
+            "baselines/nested/deep.db",
+            "baselines/top.db",
+        ]
+        assert sorted(storage.list_baselines()) == [
+            "baselines/nested/deep.db",
+            "baselines/top.db",
+        ]
+
+    def test_download_all(self, tmp_path: Path) -> None:
         remote_dir = tmp_path / "remote"
         remote_dir.mkdir()
         (remote_dir / "baselines").mkdir()
@@ -215,33 +382,56 @@ class TestLocalStorageListAndDownloadAll:
         assert (local_dir / "job2.db").exists()
         assert (local_dir / "job1.db").read_bytes() == b"db1 content"
 
+    def test_download_all_concurrent_keeps_key_order(self, tmp_path: Path) -> None:
+        remote_dir = tmp_path / "remote"
+        (remote_dir / "baselines").mkdir(parents=True)
+        for i in range(12):
+            (remote_dir / "baselines" / f"job{i}.db").write_bytes(f"db{i}".encode())
+
+        storage = LocalStorage(f"file://{remote_dir}")
+        local_dir = tmp_path / "local"
+        local_dir.mkdir()
+
+        keys = storage.list_baselines("baselines")
+        downloaded = storage.download_all(local_dir, "baselines")
+
+        assert downloaded == [local_dir / Path(key).name for key in keys]
+        for path in downloaded:
+            assert path.read_bytes() == f"db{path.stem[3:]}".encode()
+
+    def test_download_all_rejects_duplicate_file_names(self, tmp_path: Path) -> None:
+        remote_dir = tmp_path / "remote"
+        for job in ("a", "b"):
+            (remote_dir / "baselines" / job).mkdir(parents=True)
+            (remote_dir / "baselines" / job / "baseline.db").write_bytes(job.encode())
+
+        storage = LocalStorage(f"file://{remote_dir}")
+        local_dir = tmp_path / "local"
+        local_dir.mkdir()
+
+        with pytest.raises(ValueError, match="same file name"):
+            storage.download_all(local_dir, "baselines")
+        assert list(local_dir.iterdir()) == []
+
+    @pytest.mark.parametrize(
+        ("value", "expected"),
+        [("3", 3), ("64", 64), ("0", None), ("many", None), ("", None)],
+    )
+    def test_download_concurrency_env_override(self, monkeypatch, value, expected) -> None:
+        monkeypatch.setenv(DOWNLOAD_CONCURRENCY_ENV_VAR, value)
+        default = min(MAX_DOWNLOAD_WORKERS, (os.cpu_count() or 1) * 4)
+        assert download_concurrency() == (default if expected is None else expected)
+
 
 class TestCliMerge:
     """Tests for the CLI merge command."""
 
-    def test_merge_databases(self, tmp_path: Path) -> None:
-        from pytest_difftest._core import PytestDiffDatabase, calculate_fingerprint
-        from pytest_difftest.cli import merge_databases
-
-        # Create Python files for fingerprinting
-        foo_file = tmp_path / "foo.py"
-        foo_file.write_text("def foo():\n    return 'foo'\n")
-        bar_file = tmp_path / "bar.py"
-        bar_file.write_text("def bar():\n    return 'bar'\n")
-
-        # Create first source database
-        source1_path = tmp_path / "source1.db"
-        source1_db = PytestDiffDatabase(str(source1_path))
-        fp1 = calculate_fingerprint(str(foo_file))
-        source1_db.save_baseline_fingerprint(fp1)
-        source1_db.close()
-
-        # Create second source database
-        source2_path = tmp_path / "source2.db"
-        source2_db = PytestDiffDatabase(str(source2_path))
-        fp2 = calculate_fingerprint(str(bar_file))
-        source2_db.save_baseline_fingerprint(fp2)
-        source2_db.close()
+    def test_merge_databases(
+        self, tmp_path: Path, shared_foo_fp, shared_bar_fp, make_baseline_db
+    ) -> None:
+        # Create one source database per fingerprint
+        source1_path = make_baseline_db(tmp_path / "source1.db", shared_foo_fp[1])
+        source2_path = make_baseline_db(tmp_path / "source2.db", shared_bar_fp[1])
 
         # Merge into output
         output_path = tmp_path / "output.db"
@@ -250,19 +440,34 @@ class TestCliMerge:
         assert result == 0
 
         # Verify merged database
-        output_db = PytestDiffDatabase(str(output_path))
-        stats = output_db.get_stats()
+        with PytestDiffDatabase(output_path) as output_db:
+            stats = output_db.get_stats()
         assert stats["baseline_count"] == 2
 
-    def test_merge_no_inputs(self) -> None:
-        from pytest_difftest.cli import merge_databases
+    @pytest.mark.skipif(not hasattr(os, "posix_fadvise"), reason="needs posix_fadvise")
+    def test_merge_prefetches_inputs(
+        self, tmp_path: Path, shared_foo_fp, shared_bar_fp, make_baseline_db, monkeypatch
+    ) -> None:
+        sources = [
+            make_baseline_db(tmp_path / "source1.db", shared_foo_fp[1]),
+            make_baseline_db(tmp_path / "source2.db", shared_bar_fp[1]),
+        ]
+        advised = []
+        real_fadvise = os.posix_fadvise
+
+        def record(fd, offset, length, advice):
+            advised.append((os.fstat(fd).st_ino, advice))
+            return real_fadvise(fd, offset, length, advice)
+
+        monkeypatch.setattr(os, "posix_fadvise", record)
+        assert merge_databases(str(tmp_path / "output.db"), [str(p) for p in sources]) == 0
+        assert advised == [(p.stat().st_ino, os.POSIX_FADV_WILLNEED) for p in sources]
 
+    def test_merge_no_inputs(self) -> None:
         result = merge_databases("output.db", [])
         assert result == 1
 
     def test_merge_missing_input(self, tmp_path: Path) -> None:
-        from pytest_difftest.cli import merge_databases
-
         result = merge_databases(str(tmp_path / "output.db"), ["/nonexistent/path.db"])
         assert result == 1
 
@@ -270,142 +475,122 @@ class TestCliMerge:
 class TestCommitConsistencyWarning:
     """Tests for warnings when merging databases with different commits."""
 
-    def test_cli_warns_on_different_commits(self, tmp_path: Path, capsys) -> None:
-        from pytest_difftest._core import PytestDiffDatabase, calculate_fingerprint
-        from pytest_difftest.cli import merge_databases
-
-        # Create Python files
-        foo_file = tmp_path / "foo.py"
-        foo_file.write_text("def foo():\n    return 'foo'\n")
-        bar_file = tmp_path / "bar.py"
-        bar_file.write_text("def bar():\n    return 'bar'\n")
-
-        # Create first database with commit A
-        source1_path = tmp_path / "source1.db"
-        source1_db = PytestDiffDatabase(str(source1_path))
-        source1_db.save_baseline_fingerprint(calculate_fingerprint(str(foo_file)))
-        source1_db.set_metadata("baseline_commit", "aaaa1111222233334444555566667777")
-        source1_db.close()
-
-        # Create second database with commit B (different)
-        source2_path = tmp_path / "source2.db"
-        source2_db = PytestDiffDatabase(str(source2_path))
-        source2_db.save_baseline_fingerprint(calculate_fingerprint(str(bar_file)))
-        source2_db.set_metadata("baseline_commit", "bbbb1111222233334444555566667777")
-        source2_db.close()
-
-        # Merge should succeed but warn
-        output_path = tmp_path / "output.db"
-        result = merge_databases(str(output_path), [str(source1_path), str(source2_path)])
-
-        assert result == 0
-        captured = capsys.readouterr()
-        assert "different commits" in captured.err
-        assert "aaaa1111" in captured.err
-        assert "bbbb1111" in captured.err
-
-    def test_cli_no_warning_on_same_commits(self, tmp_path: Path, capsys) -> None:
-        from pytest_difftest._core import PytestDiffDatabase, calculate_fingerprint
-        from pytest_difftest.cli import merge_databases
-
-        # Create Python files
-        foo_file = tmp_path / "foo.py"
-        foo_file.write_text("def foo():\n    return 'foo'\n")
-        bar_file = tmp_path / "bar.py"
-        bar_file.write_text("def bar():\n    return 'bar'\n")
-
-        # Create both databases with the same commit
-        same_commit = "cccc1111222233334444555566667777"
-
-        source1_path = tmp_path / "source1.db"
-        source1_db = PytestDiffDatabase(str(source1_path))
-        source1_db.save_baseline_fingerprint(calculate_fingerprint(str(foo_file)))
-        source1_db.set_metadata("baseline_commit", same_commit)
-        source1_db.close()
-
-        source2_path = tmp_path / "source2.db"
-        source2_db = PytestDiffDatabase(str(source2_path))
-        source2_db.save_baseline_fingerprint(calculate_fingerprint(str(bar_file)))
-        source2_db.set_metadata("baseline_commit", same_commit)
-        source2_db.close()
-
-        # Merge should succeed without warning
+    @pytest.mark.parametrize(
+        ("commit1", "commit2", "expect_warning"),
+        [
+            pytest.param(
+                "aaaa1111222233334444555566667777",
+                "bbbb1111222233334444555566667777",
+                True,
+                id="different-commits",
+            ),
+            pytest.param(
+                "cccc1111222233334444555566667777",
+                "cccc1111222233334444555566667777",
+                False,
+                id="same-commit",
+            ),
+        ],
+    )
+    def test_cli_commit_warning(
+        self,
+        tmp_path: Path,
+        capsys,
+        shared_foo_fp,
+        shared_bar_fp,
+        make_baseline_db,
+        commit1: str,
+        commit2: str,
+        expect_warning: bool,
+    ) -> None:
+        sources = []
+        for name, fp, commit in (
+            ("source1.db", shared_foo_fp[1], commit1),
+            ("source2.db", shared_bar_fp[1], commit2),
+        ):
+            source_path = make_baseline_db(
+                tmp_path / name, fp, metadata={"baseline_commit": commit}
+            )
+            sources.append(str(source_path))
+
+        # Merge always succeeds; differing commits only produce a warning
         output_path = tmp_path / "output.db"
-        result = merge_databases(str(output_path), [str(source1_path), str(source2_path)])
+        result = merge_databases(str(output_path), sources)
 
         assert result == 0
         captured = capsys.readouterr()
-        assert "different commits" not in captured.err
+        assert ("different commits" in captured.err) is expect_warning
+        if expect_warning:
+            assert commit1[:8] in captured.err
+            assert commit2[:8] in captured.err
 
     def test_get_external_metadata(self, tmp_path: Path) -> None:
-        from pytest_difftest._core import PytestDiffDatabase
-
         # Create a database with metadata
         source_path = tmp_path / "source.db"
-        source_db = PytestDiffDatabase(str(source_path))
-        source_db.set_metadata("baseline_commit", "test_commit_sha")
-        source_db.set_metadata("other_key", "other_value")
-        source_db.close()
+        with PytestDiffDatabase(source_path) as source_db:
+            source_db.set_metadata("baseline_commit", "test_commit_sha")
+            source_db.set_metadata("other_key", "other_value")
 
         # Read metadata from external database
-        reader_db = PytestDiffDatabase(str(tmp_path / "reader.db"))
-        commit = reader_db.get_external_metadata(str(source_path), "baseline_commit")
-        other = reader_db.get_external_metadata(str(source_path), "other_key")
-        missing = reader_db.get_external_metadata(str(source_path), "nonexistent_key")
+        reader_db = PytestDiffDatabase(tmp_path / "reader.db")
+        commit = reader_db.get_external_metadata(source_path, "baseline_commit")
+        other = reader_db.get_external_metadata(source_path, "other_key")
+        missing = reader_db.get_external_metadata(source_path, "nonexistent_key")
 
         assert commit == "test_commit_sha"
         assert other == "other_value"
         assert missing is None
 
+    def test_get_external_metadata_bulk(self, tmp_path: Path) -> None:
+        paths = []
+        for i, commit in enumerate(["sha0", None, "sha2"]):
+            source_path = tmp_path / f"source{i}.db"
+            with PytestDiffDatabase(source_path) as source_db:
+                if commit:
+                    source_db.set_metadata("baseline_commit", commit)
+            paths.append(str(source_path))
+        paths.append(str(tmp_path / "missing.db"))
+
+        reader_db = PytestDiffDatabase(":memory:")
+        commits = reader_db.get_external_metadata_bulk(paths, "baseline_commit")
+
+        assert commits == dict(zip(paths, ["sha0", None, "sha2", None]))
+
 
 class TestParseRemoteUrl:
     """Tests for parse_remote_url helper."""
 
     def test_prefix_url(self) -> None:
-        from pytest_difftest._storage_ops import parse_remote_url
-
         assert parse_remote_url("s3://bucket/prefix/") == ("s3://bucket/prefix/", "")
 
     def test_file_url(self) -> None:
-        from pytest_difftest._storage_ops import parse_remote_url
-
         assert parse_remote_url("s3://bucket/path/baseline.db") == (
             "s3://bucket/path/",
             "baseline.db",
         )
 
     def test_file_url_local(self) -> None:
-        from pytest_difftest._storage_ops import parse_remote_url
-
         assert parse_remote_url("file:///tmp/dir/baseline.db") == (
             "file:///tmp/dir/",
             "baseline.db",
         )
 
     def test_prefix_url_local(self) -> None:
-        from pytest_difftest._storage_ops import parse_remote_url
-
         assert parse_remote_url("file:///tmp/dir/") == ("file:///tmp/dir/", "")
 
 
 class TestCliMergeRemote:
     """Tests for CLI merge with remote support using file:// URLs."""
 
-    def test_merge_from_remote_prefix(self, tmp_path: Path) -> None:
-        from pytest_difftest._core import PytestDiffDatabase
-        from pytest_difftest.cli import merge_databases
-
+    def test_merge_from_remote_prefix(
+        self, tmp_path: Path, shared_foo_fp, shared_bar_fp, make_baseline_db
+    ) -> None:
         # Set up remote directory with .db files
         remote_dir = tmp_path / "remote"
         remote_dir.mkdir()
 
-        foo_file = tmp_path / "foo.py"
-        foo_file.write_text("def foo():\n    return 'foo'\n")
-        bar_file = tmp_path / "bar.py"
-        bar_file.write_text("def bar():\n    return 'bar'\n")
-
-        _create_source_db(remote_dir / "job1.db", foo_file)
-        _create_source_db(remote_dir / "job2.db", bar_file)
+        make_baseline_db(remote_dir / "job1.db", shared_foo_fp[1])
+        make_baseline_db(remote_dir / "job2.db", shared_bar_fp[1])
 
         output_path = tmp_path / "merged.db"
         result = merge_databases(
@@ -414,23 +599,18 @@ class TestCliMergeRemote:
         )
 
         assert result == 0
-        db = PytestDiffDatabase(str(output_path))
+        db = PytestDiffDatabase(output_path)
         stats = db.get_stats()
         assert stats["baseline_count"] == 2
 
-    def test_merge_to_remote(self, tmp_path: Path) -> None:
-        from pytest_difftest.cli import merge_databases
-
+    def test_merge_to_remote(
+        self, tmp_path: Path, shared_foo_fp, shared_bar_fp, make_baseline_db
+    ) -> None:
         # Create local source databases
-        foo_file = tmp_path / "foo.py"
-        foo_file.write_text("def foo():\n    return 'foo'\n")
-        bar_file = tmp_path / "bar.py"
-        bar_file.write_text("def bar():\n    return 'bar'\n")
-
         source1 = tmp_path / "source1.db"
         source2 = tmp_path / "source2.db"
-        _create_source_db(source1, foo_file)
-        _create_source_db(source2, bar_file)
+        make_baseline_db(source1, shared_foo_fp[1])
+        make_baseline_db(source2, shared_bar_fp[1])
 
         # Set up remote destination
         remote_dir = tmp_path / "remote"
@@ -444,22 +624,16 @@ class TestCliMergeRemote:
         assert result == 0
         assert (remote_dir / "baseline.db").exists()
 
-    def test_merge_full_remote_round_trip(self, tmp_path: Path) -> None:
+    def test_merge_full_remote_round_trip(
+        self, tmp_path: Path, shared_foo_fp, shared_bar_fp, make_baseline_db
+    ) -> None:
         """Remote-to-remote merge: download from prefix, upload to remote URL."""
-        from pytest_difftest._core import PytestDiffDatabase
-        from pytest_difftest.cli import merge_databases
-
         # Set up remote source with .db files
         remote_src = tmp_path / "remote_src"
         remote_src.mkdir()
 
-        foo_file = tmp_path / "foo.py"
-        foo_file.write_text("def foo():\n    return 'foo'\n")
-        bar_file = tmp_path / "bar.py"
-        bar_file.write_text("def bar():\n    return 'bar'\n")
-
-        _create_source_db(remote_src / "job1.db", foo_file)
-        _create_source_db(remote_src / "job2.db", bar_file)
+        make_baseline_db(remote_src / "job1.db", shared_foo_fp[1])
+        make_baseline_db(remote_src / "job2.db", shared_bar_fp[1])
 
         # Set up remote destination
         remote_dst = tmp_path / "remote_dst"
@@ -475,25 +649,19 @@ class TestCliMergeRemote:
         assert (remote_dst / "baseline.db").exists()
 
         # Verify the uploaded file is a valid database
-        db = PytestDiffDatabase(str(remote_dst / "baseline.db"))
+        db = PytestDiffDatabase(remote_dst / "baseline.db")
         stats = db.get_stats()
         assert stats["baseline_count"] == 2
 
-    def test_merge_local_output_remote_input(self, tmp_path: Path) -> None:
+    def test_merge_local_output_remote_input(
+        self, tmp_path: Path, shared_foo_fp, shared_bar_fp, make_baseline_db
+    ) -> None:
         """Merge remote inputs into a local output path."""
-        from pytest_difftest._core import PytestDiffDatabase
-        from pytest_difftest.cli import merge_databases
-
         remote_src = tmp_path / "remote_src"
         remote_src.mkdir()
 
-        foo_file = tmp_path / "foo.py"
-        foo_file.write_text("def foo():\n    return 'foo'\n")
-        bar_file = tmp_path / "bar.py"
-        bar_file.write_text("def bar():\n    return 'bar'\n")
-
-        _create_source_db(remote_src / "job1.db", foo_file)
-        _create_source_db(remote_src / "job2.db", bar_file)
+        make_baseline_db(remote_src / "job1.db", shared_foo_fp[1])
+        make_baseline_db(remote_src / "job2.db", shared_bar_fp[1])
 
         output_path = tmp_path / "merged.db"
         result = merge_databases(
@@ -504,32 +672,27 @@ class TestCliMergeRemote:
         assert result == 0
         assert output_path.exists()
 
-        db = PytestDiffDatabase(str(output_path))
+        db = PytestDiffDatabase(output_path)
         stats = db.get_stats()
         assert stats["baseline_count"] == 2
 
-    def test_merge_mixed_local_and_remote(self, tmp_path: Path) -> None:
-        from pytest_difftest._core import PytestDiffDatabase
-        from pytest_difftest.cli import merge_databases
-
+    def test_merge_mixed_local_and_remote(
+        self, tmp_path: Path, shared_foo_fp, shared_bar_fp, make_baseline_db
+    ) -> None:
         # Set up remote source
         remote_dir = tmp_path / "remote"
         remote_dir.mkdir()
 
-        foo_file = tmp_path / "foo.py"
-        foo_file.write_text("def foo():\n    return 'foo'\n")
-        bar_file = tmp_path / "bar.py"
-        bar_file.write_text("def bar():\n    return 'bar'\n")
         baz_file = tmp_path / "baz.py"
         baz_file.write_text("def baz():\n    return 'baz'\n")
 
-        _create_source_db(remote_dir / "remote_job.db", foo_file)
+        make_baseline_db(remote_dir / "remote_job.db", shared_foo_fp[1])
 
         local_source = tmp_path / "local.db"
-        _create_source_db(local_source, bar_file)
+        make_baseline_db(local_source, shared_bar_fp[1])
 
         local_source2 = tmp_path / "local2.db"
-        _create_source_db(local_source2, baz_file)
+        make_baseline_db(local_source2, baz_file)
 
         output_path = tmp_path / "merged.db"
         result = merge_databases(
@@ -538,13 +701,11 @@ class TestCliMergeRemote:
         )
 
         assert result == 0
-        db = PytestDiffDatabase(str(output_path))
+        db = PytestDiffDatabase(output_path)
         stats = db.get_stats()
         assert stats["baseline_count"] == 3
 
     def test_merge_from_remote_empty_prefix(self, tmp_path: Path, capsys) -> None:
-        from pytest_difftest.cli import merge_databases
-
         # Remote dir exists but has no .db files
         remote_dir = tmp_path / "remote"
         remote_dir.mkdir()
@@ -559,33 +720,25 @@ class TestCliMergeRemote:
         captured = capsys.readouterr()
         assert "No .db files found" in captured.err
 
-    def test_merge_from_local_directory(self, tmp_path: Path) -> None:
-        from pytest_difftest._core import PytestDiffDatabase
-        from pytest_difftest.cli import merge_databases
-
+    def test_merge_from_local_directory(
+        self, tmp_path: Path, shared_foo_fp, shared_bar_fp, make_baseline_db
+    ) -> None:
         # Set up a local directory with .db files
         input_dir = tmp_path / "inputs"
         input_dir.mkdir()
 
-        foo_file = tmp_path / "foo.py"
-        foo_file.write_text("def foo():\n    return 'foo'\n")
-        bar_file = tmp_path / "bar.py"
-        bar_file.write_text("def bar():\n    return 'bar'\n")
-
-        _create_source_db(input_dir / "job1.db", foo_file)
-        _create_source_db(input_dir / "job2.db", bar_file)
+        make_baseline_db(input_dir / "job1.db", shared_foo_fp[1])
+        make_baseline_db(input_dir / "job2.db", shared_bar_fp[1])
 
         output_path = tmp_path / "merged.db"
         result = merge_databases(str(output_path), [str(input_dir)])
 
         assert result == 0
-        db = PytestDiffDatabase(str(output_path))
+        db = PytestDiffDatabase(output_path)
         stats = db.get_stats()
         assert stats["baseline_count"] == 2
 
     def test_merge_no_inputs_error(self, capsys) -> None:
-        from pytest_difftest.cli import merge_databases
-
         result = merge_databases("output.db", [])
 
         assert result == 1
@@ -596,20 +749,14 @@ class TestCliMergeRemote:
 class TestDownloadSingleBaselineCaching:
     """Tests for persistent cache path and import-skip logic in _download_single_baseline."""
 
-    def test_skips_import_on_cache_hit(self, tmp_path: Path) -> None:
+    def test_skips_import_on_cache_hit(self, tmp_path: Path, make_baseline_db) -> None:
         """Second call with unchanged remote skips the destructive import."""
-        import logging
-
-        from pytest_difftest._core import PytestDiffDatabase
-        from pytest_difftest._storage_ops import _download_single_baseline
-        from pytest_difftest.storage.local import LocalStorage
-
         # Set up a remote baseline
         remote_dir = tmp_path / "remote"
         remote_dir.mkdir()
         py_file = tmp_path / "mod.py"
         py_file.write_text("x = 1\n")
-        _create_source_db(remote_dir / "baseline.db", py_file)
+        make_baseline_db(remote_dir / "baseline.db", py_file)
 
         storage = LocalStorage(f"file://{remote_dir}")
 
@@ -617,7 +764,7 @@ class TestDownloadSingleBaselineCaching:
         cache_dir = tmp_path / "cache"
         cache_dir.mkdir()
         db_path = cache_dir / "pytest_difftest.db"
-        db = PytestDiffDatabase(str(db_path))
+        db = PytestDiffDatabase(db_path)
         log = logging.getLogger("test")
 
         # First call: downloads and imports
@@ -633,25 +780,19 @@ class TestDownloadSingleBaselineCaching:
         stats_after_second = db.get_stats()
         assert stats_after_second["baseline_count"] == 1
 
-    def test_reimports_when_remote_changes(self, tmp_path: Path) -> None:
+    def test_reimports_when_remote_changes(self, tmp_path: Path, make_baseline_db) -> None:
         """When remote baseline changes, it re-downloads and re-imports."""
-        import logging
-
-        from pytest_difftest._core import PytestDiffDatabase
-        from pytest_difftest._storage_ops import _download_single_baseline
-        from pytest_difftest.storage.local import LocalStorage
-
         remote_dir = tmp_path / "remote"
         remote_dir.mkdir()
         py_file = tmp_path / "mod.py"
         py_file.write_text("x = 1\n")
-        _create_source_db(remote_dir / "baseline.db", py_file)
+        make_baseline_db(remote_dir / "baseline.db", py_file)
 
         storage = LocalStorage(f"file://{remote_dir}")
         cache_dir = tmp_path / "cache"
         cache_dir.mkdir()
         db_path = cache_dir / "pytest_difftest.db"
-        db = PytestDiffDatabase(str(db_path))
+        db = PytestDiffDatabase(db_path)
         log = logging.getLogger("test")
 
         # First call
@@ -659,36 +800,28 @@ class TestDownloadSingleBaselineCaching:
         assert db.get_stats()["baseline_count"] == 1
 
         # Update remote with a different file (newer mtime triggers re-download)
-        import time
-
         time.sleep(0.05)  # Ensure mtime differs
         py_file2 = tmp_path / "mod2.py"
         py_file2.write_text("y = 2\n")
-        _create_source_db(remote_dir / "baseline.db", py_file2)
+        make_baseline_db(remote_dir / "baseline.db", py_file2)
 
         # Second call: remote changed → re-downloads and re-imports
         _download_single_baseline(storage, "baseline.db", db, db_path, str(tmp_path), log)
         assert db.get_metadata("remote_baseline_etag") == "1"
 
-    def test_reimports_when_db_recreated(self, tmp_path: Path) -> None:
+    def test_reimports_when_db_recreated(self, tmp_path: Path, make_baseline_db) -> None:
         """When local DB is recreated (metadata lost), re-imports even on cache hit."""
-        import logging
-
-        from pytest_difftest._core import PytestDiffDatabase
-        from pytest_difftest._storage_ops import _download_single_baseline
-        from pytest_difftest.storage.local import LocalStorage
-
         remote_dir = tmp_path / "remote"
         remote_dir.mkdir()
         py_file = tmp_path / "mod.py"
         py_file.write_text("x = 1\n")
-        _create_source_db(remote_dir / "baseline.db", py_file)
+        make_baseline_db(remote_dir / "baseline.db", py_file)
 
         storage = LocalStorage(f"file://{remote_dir}")
         cache_dir = tmp_path / "cache"
         cache_dir.mkdir()
         db_path = cache_dir / "pytest_difftest.db"
-        db = PytestDiffDatabase(str(db_path))
+        db = PytestDiffDatabase(db_path)
         log = logging.getLogger("test")
 
         # First call: import succeeds
@@ -698,7 +831,7 @@ class TestDownloadSingleBaselineCaching:
         # Simulate DB recreation: new DB instance without the metadata marker
         db.close()
         db_path.unlink()
-        db = PytestDiffDatabase(str(db_path))
+        db = PytestDiffDatabase(db_path)
 
         # Cache file still exists → download returns False, but no metadata → re-imports
         _download_single_baseline(storage, "baseline.db", db, db_path, str(tmp_path), log)
@@ -8,19 +8,46 @@
 // - Automatic cleanup of old test executions
 
 use anyhow::{Context, Result};
-use parking_lot::RwLock;
+use parking_lot::{
+    MappedRwLockReadGuard, MappedRwLockWriteGuard, RwLock, RwLockReadGuard, RwLockWriteGuard,
+};
 use pyo3::prelude::*;
 use rusqlite::{params, Connection, OptionalExtension};
 use std::collections::{HashMap, HashSet};
-use std::path::Path;
+use std::path::{Path, PathBuf};
 use std::sync::Arc;
 
 use crate::cache::Cache;
+use crate::path_str;
 use crate::types::Fingerprint;
 
 /// Default busy timeout in milliseconds for concurrent access
 const BUSY_TIMEOUT_MS: i32 = 30_000; // 30 seconds
 
+/// Path opening a private in-memory database (nothing is persisted)
+const IN_MEMORY_PATH: &str = ":memory:";
+
+/// SQLite's default limit on simultaneously attached databases
+const MAX_ATTACHED: usize = 10;
+
+/// Prepared statements kept per connection. Covers every fixed-text hot-path
+/// statement (fingerprint/baseline/metadata reads and writes, stats).
+const STATEMENT_CACHE_CAPACITY: usize = 32;
+
+/// Environment variable overriding `PRAGMA synchronous` for every connection.
+/// Throwaway databases (e.g. the test suite) can set it to `OFF` to skip fsyncs.
+const SYNCHRONOUS_ENV_VAR: &str = "PYTEST_DIFFTEST_SQLITE_SYNCHRONOUS";
+
+/// Map a `PRAGMA synchronous` override to a known SQLite level (default: NORMAL)
+fn synchronous_level(value: Option<&str>) -> &'static str {
+    match value.map(|v| v.trim().to_ascii_uppercase()).as_deref() {
+        Some("OFF") => "OFF",
+        Some("FULL") => "FULL",
+        Some("EXTRA") => "EXTRA",
+        _ => "NORMAL",
+    }
+}
+
 /// Result of an import or merge operation
 #[pyclass]
 #[derive(Clone, Debug)]
@@ -31,6 +58,71 @@ pub struct ImportResult {
     pub test_execution_count: usize,
 }
 
+/// Connection shared by a database and its transactions; `None` once the
+/// database's `with` block has closed it
+type SharedConnection = Arc<RwLock<Option<Connection>>>;
+
+/// Lock the shared connection for reading, failing if it has been closed
+fn read_conn(conn: &RwLock<Option<Connection>>) -> Result<MappedRwLockReadGuard<'_, Connection>> {
+    RwLockReadGuard::try_map(conn.read(), Option::as_ref)
+        .map_err(|_| anyhow::anyhow!("Database is closed"))
+}
+
+/// Lock the shared connection for writing, failing if it has been closed
+fn write_conn(conn: &RwLock<Option<Connection>>) -> Result<MappedRwLockWriteGuard<'_, Connection>> {
+    RwLockWriteGuard::try_map(conn.write(), Option::as_mut)
+        .map_err(|_| anyhow::anyhow!("Database is closed"))
+}
+
+/// Explicit write transaction returned by `PytestDiffDatabase.transaction()`
+///
+/// Used as a context manager: `BEGIN IMMEDIATE` on enter, `COMMIT` on a clean
+/// exit and `ROLLBACK` if the block raises. Single-statement writes issued
+/// inside (e.g. `save_baseline_fingerprint`, `set_metadata`) then share one
+/// commit instead of committing individually.
+#[pyclass(unsendable)]
+pub struct Transaction {
+    conn: SharedConnection,
+}
+
+#[pymethods]
+impl Transaction {
+    fn __enter__(slf: PyRef<'_, Self>) -> PyResult<PyRef<'_, Self>> {
+        write_conn(&slf.conn)
+            .and_then(|conn| Ok(conn.execute_batch("BEGIN IMMEDIATE")?))
+            .map_err(|e| {
+                pyo3::exceptions::PyRuntimeError::new_err(format!(
+                    "Failed to begin transaction: {}",
+                    e
+                ))
+            })?;
+        Ok(slf)
+    }
+
+    fn __exit__(
+        &self,
+        exc_type: Option<&Bound<'_, PyAny>>,
+        _exc_value: Option<&Bound<'_, PyAny>>,
+        _traceback: Option<&Bound<'_, PyAny>>,
+    ) -> PyResult<bool> {
+        let statement = if exc_type.is_some() {
+            "ROLLBACK"
+        } else {
+            "COMMIT"
+        };
+        write_conn(&self.conn)
+            .and_then(|conn| Ok(conn.execute_batch(statement)?))
+            .map_err(|e| {
+                pyo3::exceptions::PyRuntimeError::new_err(format!(
+                    "Failed to end transaction ({}): {}",
+                    statement, e
+                ))
+            })?;
+        // Never swallow the exception raised inside the block
+        Ok(false)
+    }
+}
+
 /// Main database interface for pytest-difftest
 ///
 /// Manages the pytest-difftest SQLite database with optimizations:
@@ -40,7 +132,7 @@ pub struct ImportResult {
 /// - In-memory cache for frequently accessed data
 #[pyclass(unsendable)]
 pub struct PytestDiffDatabase {
-    conn: Arc<RwLock<Connection>>,
+    conn: SharedConnection,
     cache: Arc<Cache>,
     current_environment_id: Arc<RwLock<Option<i64>>>,
 }
@@ -52,13 +144,16 @@ impl PytestDiffDatabase {
     }
 
     /// Create a new database connection with optimizations
+    ///
+    /// `":memory:"` opens a private in-memory database (SQLite keeps its
+    /// journal in memory, so the WAL pragma is a no-op there).
     fn new_internal(path: &str) -> Result<Self> {
-        let path_obj = Path::new(path);
-
         // Create parent directory if it doesn't exist
-        if let Some(parent) = path_obj.parent() {
-            std::fs::create_dir_all(parent)
-                .with_context(|| format!("Failed to create directory: {:?}", parent))?;
+        if path != IN_MEMORY_PATH {
+            if let Some(parent) = Path::new(path).parent() {
+                std::fs::create_dir_all(parent)
+                    .with_context(|| format!("Failed to create directory: {:?}", parent))?;
+            }
         }
 
         let conn =
@@ -70,24 +165,26 @@ impl PytestDiffDatabase {
             .context("Failed to set busy timeout")?;
 
         // Apply performance optimizations
-        conn.execute_batch(
+        let synchronous = synchronous_level(std::env::var(SYNCHRONOUS_ENV_VAR).ok().as_deref());
+        conn.execute_batch(&format!(
             "
             PRAGMA journal_mode = WAL;
-            PRAGMA synchronous = NORMAL;
+            PRAGMA synchronous = {synchronous};
             PRAGMA cache_size = -64000;
             PRAGMA temp_store = MEMORY;
             PRAGMA mmap_size = 268435456;
             PRAGMA foreign_keys = ON;
             ",
-        )
+        ))
         .context("Failed to set SQLite pragmas")?;
+        conn.set_prepared_statement_cache_capacity(STATEMENT_CACHE_CAPACITY);
 
         // Create schema
         Self::create_schema(&conn)?;
 
         #[allow(clippy::arc_with_non_send_sync)]
         Ok(Self {
-            conn: Arc::new(RwLock::new(conn)),
+            conn: Arc::new(RwLock::new(Some(conn))),
             cache: Arc::new(Cache::new()),
             current_environment_id: Arc::new(RwLock::new(None)),
         })
@@ -102,7 +199,7 @@ impl PytestDiffDatabase {
 
     /// Close database and checkpoint WAL (public Rust API)
     pub fn close_and_checkpoint(&self) -> Result<()> {
-        let conn = self.conn.write();
+        let conn = write_conn(&self.conn)?;
         // Checkpoint WAL to merge changes into main database file
         conn.execute_batch("PRAGMA wal_checkpoint(TRUNCATE);")
             .context("Failed to checkpoint WAL")?;
@@ -119,7 +216,7 @@ impl PytestDiffDatabase {
             }
         }
 
-        let conn = self.conn.write();
+        let conn = write_conn(&self.conn)?;
 
         // Try to find existing environment
         let existing_id: Option<i64> = conn
@@ -157,7 +254,7 @@ impl PytestDiffDatabase {
     /// Store or retrieve fingerprint ID (used in tests)
     #[cfg(test)]
     fn get_or_create_fingerprint(&self, fp: &Fingerprint) -> Result<i64> {
-        let conn = self.conn.write();
+        let conn = write_conn(&self.conn)?;
 
         // Serialize checksums to blob
         let checksums_blob = serialize_checksums(&fp.checksums);
@@ -201,28 +298,27 @@ impl PytestDiffDatabase {
     /// Get stored fingerprint from database, bypassing cache
     /// This should be used for change detection to ensure we get the latest stored value
     pub fn get_fingerprint_no_cache(&self, filename: &str) -> Result<Option<Fingerprint>> {
-        let conn = self.conn.read();
+        let conn = read_conn(&self.conn)?;
 
-        conn.query_row(
+        let mut stmt = conn.prepare_cached(
             "SELECT filename, method_checksums, mtime, fsha
                  FROM file_fp
                  WHERE filename = ?1
                  ORDER BY id DESC
                  LIMIT 1",
-            params![filename],
-            |row| {
-                let checksums_blob: Vec<u8> = row.get(1)?;
-                let checksums = deserialize_checksums(&checksums_blob);
-
-                Ok(Fingerprint {
-                    filename: row.get(0)?,
-                    checksums,
-                    mtime: row.get(2)?,
-                    file_hash: row.get(3)?,
-                    blocks: None,
-                })
-            },
-        )
+        )?;
+        stmt.query_row(params![filename], |row| {
+            let checksums_blob: Vec<u8> = row.get(1)?;
+            let checksums = deserialize_checksums(&checksums_blob);
+
+            Ok(Fingerprint {
+                filename: row.get(0)?,
+                checksums,
+                mtime: row.get(2)?,
+                file_hash: row.get(3)?,
+                blocks: None,
+            })
+        })
         .optional()
         .context("Failed to query fingerprint")
     }
@@ -235,29 +331,28 @@ impl PytestDiffDatabase {
             return Ok(Some(cached));
         }
 
-        let conn = self.conn.read();
+        let conn = read_conn(&self.conn)?;
 
         let result = conn
-            .query_row(
+            .prepare_cached(
                 "SELECT filename, method_checksums, mtime, fsha
                  FROM file_fp
                  WHERE filename = ?1
                  ORDER BY id DESC
                  LIMIT 1",
-                params![filename],
-                |row| {
-                    let checksums_blob: Vec<u8> = row.get(1)?;
-                    let checksums = deserialize_checksums(&checksums_blob);
+            )?
+            .query_row(params![filename], |row| {
+                let checksums_blob: Vec<u8> = row.get(1)?;
+                let checksums = deserialize_checksums(&checksums_blob);
 
-                    Ok(Fingerprint {
-                        filename: row.get(0)?,
-                        checksums,
-                        mtime: row.get(2)?,
-                        file_hash: row.get(3)?,
-                        blocks: None,
-                    })
-                },
-            )
+                Ok(Fingerprint {
+                    filename: row.get(0)?,
+                    checksums,
+                    mtime: row.get(2)?,
+                    file_hash: row.get(3)?,
+                    blocks: None,
+                })
+            })
             .optional()
             .context("Failed to query fingerprint")?;
 
@@ -273,12 +368,22 @@ impl PytestDiffDatabase {
 #[pymethods]
 impl PytestDiffDatabase {
     #[new]
-    fn new(path: &str) -> PyResult<Self> {
-        Self::new_internal(path).map_err(|e| {
+    fn new(path: PathBuf) -> PyResult<Self> {
+        Self::new_internal(path_str(&path)?).map_err(|e| {
             pyo3::exceptions::PyIOError::new_err(format!("Failed to open database: {}", e))
         })
     }
 
+    /// Start an explicit write transaction, to be used as a context manager
+    ///
+    /// Methods that manage their own transaction (`save_test_execution`,
+    /// `import_baseline_from`, `merge_baseline_from`) cannot be nested in it.
+    fn transaction(&self) -> Transaction {
+        Transaction {
+            conn: Arc::clone(&self.conn),
+        }
+    }
+
     /// Save a test execution record with its fingerprints
     ///
     /// # Arguments
@@ -369,6 +474,21 @@ impl PytestDiffDatabase {
             })
     }
 
+    /// Save many baseline fingerprints in one transaction
+    ///
+    /// Same semantics as `save_baseline_fingerprint` for each item, but with a
+    /// single FFI call, one prepared INSERT and one commit. Returns the number
+    /// of fingerprints saved. Cannot be nested in `transaction()`.
+    fn save_baseline_fingerprints(&mut self, fingerprints: Vec<Fingerprint>) -> PyResult<usize> {
+        self.save_baseline_fingerprints_batch(fingerprints)
+            .map_err(|e| {
+                pyo3::exceptions::PyRuntimeError::new_err(format!(
+                    "Failed to save baseline fingerprints: {}",
+                    e
+                ))
+            })
+    }
+
     /// Get baseline fingerprint for a file
     fn get_baseline_fingerprint(&self, filename: &str) -> PyResult<Option<Fingerprint>> {
         self.get_baseline_fingerprint_internal(filename)
@@ -382,10 +502,14 @@ impl PytestDiffDatabase {
 
     /// Clear all baseline fingerprints
     fn clear_baseline(&mut self) -> PyResult<()> {
-        let conn = self.conn.write();
-        conn.execute("DELETE FROM baseline_fp", []).map_err(|e| {
-            pyo3::exceptions::PyRuntimeError::new_err(format!("Failed to clear baseline: {}", e))
-        })?;
+        write_conn(&self.conn)
+            .and_then(|conn| Ok(conn.execute("DELETE FROM baseline_fp", [])?))
+            .map_err(|e| {
+                pyo3::exceptions::PyRuntimeError::new_err(format!(
+                    "Failed to clear baseline: {}",
+                    e
+                ))
+            })?;
         Ok(())
     }
 
@@ -394,8 +518,8 @@ impl PytestDiffDatabase {
     /// Bulk-copies `baseline_fp`, `environment`, `file_fp`, `test_execution`, and
     /// `test_execution_file_fp` rows from `source_db_path` into the local database,
     /// replacing any existing data. Returns an `ImportResult` with counts.
-    fn import_baseline_from(&mut self, source_db_path: &str) -> PyResult<ImportResult> {
-        self.import_baseline_from_internal(source_db_path)
+    fn import_baseline_from(&mut self, source_db_path: PathBuf) -> PyResult<ImportResult> {
+        self.import_baseline_from_internal(path_str(&source_db_path)?)
             .map_err(|e| {
                 pyo3::exceptions::PyRuntimeError::new_err(format!(
                     "Failed to import baseline: {}",
@@ -410,8 +534,8 @@ impl PytestDiffDatabase {
     /// Uses INSERT OR REPLACE to accumulate baselines from multiple sources,
     /// allowing incremental merging of databases from parallel CI jobs.
     /// Returns an `ImportResult` with counts.
-    fn merge_baseline_from(&mut self, source_db_path: &str) -> PyResult<ImportResult> {
-        self.merge_baseline_from_internal(source_db_path)
+    fn merge_baseline_from(&mut self, source_db_path: PathBuf) -> PyResult<ImportResult> {
+        self.merge_baseline_from_internal(path_str(&source_db_path)?)
             .map_err(|e| {
                 pyo3::exceptions::PyRuntimeError::new_err(format!(
                     "Failed to merge baseline: {}",
@@ -423,8 +547,34 @@ impl PytestDiffDatabase {
     /// Read a metadata value from an external database file without importing it.
     ///
     /// Useful for checking metadata (e.g., baseline_commit) before merging.
-    fn get_external_metadata(&self, source_db_path: &str, key: &str) -> PyResult<Option<String>> {
-        self.get_external_metadata_internal(source_db_path, key)
+    fn get_external_metadata(
+        &self,
+        source_db_path: PathBuf,
+        key: &str,
+    ) -> PyResult<Option<String>> {
+        self.get_external_metadata_internal(path_str(&source_db_path)?, key)
+            .map_err(|e| {
+                pyo3::exceptions::PyRuntimeError::new_err(format!(
+                    "Failed to get external metadata: {}",
+                    e
+                ))
+            })
+    }
+
+    /// Read one metadata key from several external database files.
+    ///
+    /// Sources are attached up to ten at a time and read with a single query
+    /// per batch. Missing or unreadable sources map to None.
+    fn get_external_metadata_bulk(
+        &self,
+        source_db_paths: Vec<PathBuf>,
+        key: &str,
+    ) -> PyResult<HashMap<String, Option<String>>> {
+        let source_db_paths = source_db_paths
+            .iter()
+            .map(|path| path_str(path).map(str::to_owned))
+            .collect::<PyResult<Vec<_>>>()?;
+        self.get_external_metadata_bulk_internal(&source_db_paths, key)
             .map_err(|e| {
                 pyo3::exceptions::PyRuntimeError::new_err(format!(
                     "Failed to get external metadata: {}",
@@ -467,11 +617,15 @@ impl PytestDiffDatabase {
         })
     }
 
-    /// Close the database and checkpoint WAL to remove -wal and -shm files
+    /// Checkpoint the WAL into the main database file (TRUNCATE empties -wal)
+    ///
+    /// The connection stays open, so the database remains usable; leaving a
+    /// `with` block is what releases the file. No-op once it is closed.
     fn close(&self) -> PyResult<()> {
-        let conn = self.conn.write();
-        // Checkpoint WAL to merge it into main database file
-        // TRUNCATE mode will truncate the WAL file to zero bytes
+        let guard = self.conn.write();
+        let Some(conn) = &*guard else {
+            return Ok(());
+        };
         conn.execute_batch("PRAGMA wal_checkpoint(TRUNCATE);")
             .map_err(|e| {
                 pyo3::exceptions::PyRuntimeError::new_err(format!(
@@ -481,6 +635,29 @@ impl PytestDiffDatabase {
             })?;
         Ok(())
     }
+
+    fn __enter__(slf: PyRef<'_, Self>) -> PyRef<'_, Self> {
+        slf
+    }
+
+    /// Checkpoint and close the connection when leaving a `with` block
+    ///
+    /// Dropping the connection releases the file handle and its locks, and
+    /// SQLite removes the -wal and -shm files. Any later call on this object
+    /// (or on a transaction created from it) raises "Database is closed".
+    fn __exit__(
+        &self,
+        _exc_type: Option<&Bound<'_, PyAny>>,
+        _exc_value: Option<&Bound<'_, PyAny>>,
+        _traceback: Option<&Bound<'_, PyAny>>,
+    ) -> PyResult<bool> {
+        let checkpoint = self.close();
+        // Close even if the checkpoint failed, so the file is always released
+        drop(self.conn.write().take());
+        checkpoint?;
+        // Never swallow the exception raised inside the block
+        Ok(false)
+    }
 }
 
 // Internal implementation methods
@@ -496,26 +673,32 @@ impl PytestDiffDatabase {
         // Get or create environment
         let env_id = self.get_or_create_environment("default", python_version)?;
 
-        let mut conn = self.conn.write();
+        let mut conn = write_conn(&self.conn)?;
 
         // Use BEGIN IMMEDIATE for fail-fast on write conflicts (pytest-xdist compatibility)
         let tx = conn.transaction_with_behavior(rusqlite::TransactionBehavior::Immediate)?;
 
         // Delete previous executions for this test in this environment
         // This keeps the database from growing unbounded
-        tx.execute(
+        tx.prepare_cached(
             "DELETE FROM test_execution
              WHERE environment_id = ?1 AND test_name = ?2",
-            params![env_id, test_name],
-        )
+        )?
+        .execute(params![env_id, test_name])
         .context("Failed to delete old test execution")?;
 
         // Insert test execution
-        tx.execute(
+        tx.prepare_cached(
             "INSERT INTO test_execution (environment_id, test_name, duration, failed, forced)
              VALUES (?1, ?2, ?3, ?4, ?5)",
-            params![env_id, test_name, duration, if failed { 1 } else { 0 }, 0],
-        )
+        )?
+        .execute(params![
+            env_id,
+            test_name,
+            duration,
+            if failed { 1 } else { 0 },
+            0
+        ])
         .context("Failed to insert test execution")?;
 
         let test_execution_id = tx.last_insert_rowid();
@@ -524,11 +707,11 @@ impl PytestDiffDatabase {
         for fp in fingerprints {
             let fp_id = self.get_or_create_fingerprint_in_tx(&tx, &fp)?;
 
-            tx.execute(
+            tx.prepare_cached(
                 "INSERT INTO test_execution_file_fp (test_execution_id, fingerprint_id)
                  VALUES (?1, ?2)",
-                params![test_execution_id, fp_id],
-            )
+            )?
+            .execute(params![test_execution_id, fp_id])
             .context("Failed to link test to fingerprint")?;
         }
 
@@ -545,9 +728,11 @@ impl PytestDiffDatabase {
         let checksums_blob = serialize_checksums(&fp.checksums);
 
         let existing_id: Option<i64> = tx
-            .query_row(
+            .prepare_cached(
                 "SELECT id FROM file_fp
                  WHERE filename = ?1 AND fsha = ?2 AND method_checksums = ?3",
+            )?
+            .query_row(
                 params![&fp.filename, &fp.file_hash, checksums_blob],
                 |row| row.get(0),
             )
@@ -560,11 +745,16 @@ impl PytestDiffDatabase {
             // No exact match - insert new fingerprint
             // We always insert new fingerprints to maintain history
             // Change detection relies on comparing current state vs stored state
-            tx.execute(
+            tx.prepare_cached(
                 "INSERT INTO file_fp (filename, method_checksums, mtime, fsha)
                  VALUES (?1, ?2, ?3, ?4)",
-                params![&fp.filename, checksums_blob, fp.mtime, &fp.file_hash],
-            )?;
+            )?
+            .execute(params![
+                &fp.filename,
+                checksums_blob,
+                fp.mtime,
+                &fp.file_hash
+            ])?;
             Ok(tx.last_insert_rowid())
         }
     }
@@ -577,7 +767,7 @@ impl PytestDiffDatabase {
             return Ok(vec![]);
         }
 
-        let conn = self.conn.read();
+        let conn = read_conn(&self.conn)?;
 
         // Build a single query for all changed files (more efficient than N queries)
         let filenames: Vec<&str> = changed_blocks.keys().map(|s| s.as_str()).collect();
@@ -647,7 +837,7 @@ impl PytestDiffDatabase {
     }
 
     fn get_recorded_tests_internal(&self) -> Result<Vec<String>> {
-        let conn = self.conn.read();
+        let conn = read_conn(&self.conn)?;
         let mut stmt = conn.prepare("SELECT DISTINCT test_name FROM test_execution")?;
         let rows = stmt.query_map([], |row| row.get(0))?;
         let mut tests: Vec<String> = rows.collect::<std::result::Result<_, _>>()?;
@@ -656,43 +846,48 @@ impl PytestDiffDatabase {
     }
 
     fn get_stats_internal(&self) -> Result<HashMap<String, i64>> {
-        let conn = self.conn.read();
+        let conn = read_conn(&self.conn)?;
         let mut stats = HashMap::new();
 
-        // Count tests
-        let test_count: i64 =
-            conn.query_row("SELECT COUNT(*) FROM test_execution", [], |row| row.get(0))?;
-        stats.insert("test_count".to_string(), test_count);
-
-        // Count files
-        let file_count: i64 =
-            conn.query_row("SELECT COUNT(DISTINCT filename) FROM file_fp", [], |row| {
-                row.get(0)
-            })?;
-        stats.insert("file_count".to_string(), file_count);
-
-        // Count fingerprints
-        let fp_count: i64 = conn.query_row("SELECT COUNT(*) FROM file_fp", [], |row| row.get(0))?;
-        stats.insert("fingerprint_count".to_string(), fp_count);
+        let count = |sql: &str| -> Result<i64> {
+            Ok(conn.prepare_cached(sql)?.query_row([], |row| row.get(0))?)
+        };
 
-        // Count baselines
-        let baseline_count: i64 =
-            conn.query_row("SELECT COUNT(*) FROM baseline_fp", [], |row| row.get(0))?;
-        stats.insert("baseline_count".to_string(), baseline_count);
+        stats.insert(
+            "test_count".to_string(),
+            count("SELECT COUNT(*) FROM test_execution")?,
+        );
+        stats.insert(
+            "file_count".to_string(),
+            count("SELECT COUNT(DISTINCT filename) FROM file_fp")?,
+        );
+        stats.insert(
+            "fingerprint_count".to_string(),
+            count("SELECT COUNT(*) FROM file_fp")?,
+        );
+        stats.insert(
+            "baseline_count".to_string(),
+            count("SELECT COUNT(*) FROM baseline_fp")?,
+        );
 
         Ok(stats)
     }
 
     pub fn save_baseline_fingerprint_internal(&mut self, fp: Fingerprint) -> Result<()> {
-        let conn = self.conn.write();
+        let conn = write_conn(&self.conn)?;
         let checksums_blob = serialize_checksums(&fp.checksums);
 
         // Use INSERT OR REPLACE to update existing baseline
-        conn.execute(
+        conn.prepare_cached(
             "INSERT OR REPLACE INTO baseline_fp (filename, method_checksums, mtime, fsha)
              VALUES (?1, ?2, ?3, ?4)",
-            params![&fp.filename, checksums_blob, fp.mtime, &fp.file_hash],
-        )
+        )?
+        .execute(params![
+            &fp.filename,
+            checksums_blob,
+            fp.mtime,
+            &fp.file_hash
+        ])
         .context("Failed to save baseline fingerprint")?;
 
         Ok(())
@@ -703,23 +898,30 @@ impl PytestDiffDatabase {
         &mut self,
         fingerprints: Vec<Fingerprint>,
     ) -> Result<usize> {
-        let mut conn = self.conn.write();
+        let mut conn = write_conn(&self.conn)?;
 
         // Start transaction
         let tx = conn.transaction()?;
 
         let mut count = 0;
-        for fp in fingerprints {
-            let checksums_blob = serialize_checksums(&fp.checksums);
-
-            tx.execute(
+        {
+            let mut stmt = tx.prepare_cached(
                 "INSERT OR REPLACE INTO baseline_fp (filename, method_checksums, mtime, fsha)
                  VALUES (?1, ?2, ?3, ?4)",
-                params![&fp.filename, checksums_blob, fp.mtime, &fp.file_hash],
-            )
-            .context("Failed to save baseline fingerprint in batch")?;
-
-            count += 1;
+            )?;
+            for fp in fingerprints {
+                let checksums_blob = serialize_checksums(&fp.checksums);
+
+                stmt.execute(params![
+                    &fp.filename,
+                    checksums_blob,
+                    fp.mtime,
+                    &fp.file_hash
+                ])
+                .context("Failed to save baseline fingerprint in batch")?;
+
+                count += 1;
+            }
         }
 
         // Commit transaction
@@ -812,7 +1014,7 @@ impl PytestDiffDatabase {
             anyhow::bail!("Source database does not exist: {}", source_db_path);
         }
 
-        let conn = self.conn.write();
+        let conn = write_conn(&self.conn)?;
 
         // Attach the source database
         conn.execute("ATTACH DATABASE ?1 AS source_db", params![source_db_path])
@@ -917,38 +1119,45 @@ impl PytestDiffDatabase {
             anyhow::bail!("Source database does not exist: {}", source_db_path);
         }
 
-        let conn = self.conn.write();
+        let conn = write_conn(&self.conn)?;
 
         // Attach the source database
         conn.execute("ATTACH DATABASE ?1 AS source_db", params![source_db_path])
             .with_context(|| format!("Failed to attach source database: {}", source_db_path))?;
 
-        // Merge baselines using INSERT OR REPLACE (does NOT clear existing baselines)
         let result = (|| -> Result<ImportResult> {
-            let baseline_count = conn
-                .execute(
-                    "INSERT OR REPLACE INTO baseline_fp (filename, method_checksums, mtime, fsha, created_at)
-                     SELECT filename, method_checksums, mtime, fsha, created_at
-                     FROM source_db.baseline_fp",
-                    [],
-                )
-                .context("Failed to merge baselines from source")?;
-
-            // Merge metadata: union baseline_scope JSON arrays, replace everything else
-            Self::merge_metadata(&conn)?;
+            let has_test_execution = Self::source_table_exists(&conn, "test_execution")?;
 
-            // Merge test execution data if source has those tables (backward compat)
-            let test_execution_count = if Self::source_table_exists(&conn, "test_execution")? {
-                // Disable FK checks for bulk insert performance; we handle
-                // referential integrity manually via explicit deletes below.
-                // Must be set outside a transaction to take effect.
+            // Disable FK checks for bulk insert performance; we handle
+            // referential integrity manually via explicit deletes below.
+            // Must be set outside a transaction to take effect.
+            if has_test_execution {
                 conn.execute_batch("PRAGMA foreign_keys=OFF")
                     .context("Failed to disable foreign keys")?;
+            }
+
+            // One transaction per source: baselines, metadata and test
+            // executions are committed together (a single commit instead of
+            // one per statement outside the test execution block)
+            conn.execute_batch("BEGIN")
+                .context("Failed to begin merge transaction")?;
+
+            let merged = (|| -> Result<ImportResult> {
+                // Merge baselines using INSERT OR REPLACE (does NOT clear existing baselines)
+                let baseline_count = conn
+                    .execute(
+                        "INSERT OR REPLACE INTO baseline_fp (filename, method_checksums, mtime, fsha, created_at)
+                         SELECT filename, method_checksums, mtime, fsha, created_at
+                         FROM source_db.baseline_fp",
+                        [],
+                    )
+                    .context("Failed to merge baselines from source")?;
 
-                conn.execute_batch("BEGIN")
-                    .context("Failed to begin merge transaction")?;
+                // Merge metadata: union baseline_scope JSON arrays, replace everything else
+                Self::merge_metadata(&conn)?;
 
-                let te_result = (|| -> Result<usize> {
+                // Merge test execution data if source has those tables (backward compat)
+                let test_execution_count = if has_test_execution {
                     // 1. Merge environments (natural key: name+packages+version)
                     conn.execute(
                         "INSERT OR IGNORE INTO environment (environment_name, system_packages, python_version)
@@ -1037,40 +1246,41 @@ impl PytestDiffDatabase {
                     )
                     .context("Failed to merge test_execution_file_fp from source")?;
 
-                    Ok(te_count)
-                })();
-
-                // Always clean up temp tables and handle transaction
-                let _ = conn.execute_batch(
-                    "DROP TABLE IF EXISTS _env_map;
-                     DROP TABLE IF EXISTS _fp_map",
-                );
-
-                let count = match te_result {
-                    Ok(count) => {
-                        conn.execute_batch("COMMIT")
-                            .context("Failed to commit merge transaction")?;
-                        count
-                    }
-                    Err(e) => {
-                        let _ = conn.execute_batch("ROLLBACK");
-                        return Err(e);
-                    }
+                    te_count
+                } else {
+                    0
                 };
 
-                // Re-enable FK checks
+                Ok(ImportResult {
+                    baseline_count,
+                    test_execution_count,
+                })
+            })();
+
+            // Always clean up temp tables and handle transaction
+            let _ = conn.execute_batch(
+                "DROP TABLE IF EXISTS _env_map;
+                 DROP TABLE IF EXISTS _fp_map",
+            );
+
+            let merged = match merged {
+                Ok(merged) => conn
+                    .execute_batch("COMMIT")
+                    .context("Failed to commit merge transaction")
+                    .map(|_| merged),
+                Err(e) => {
+                    let _ = conn.execute_batch("ROLLBACK");
+                    Err(e)
+                }
+            };
+
+            // Re-enable FK checks, also after a failed merge
+            if has_test_execution {
                 conn.execute_batch("PRAGMA foreign_keys=ON")
                     .context("Failed to re-enable foreign keys")?;
+            }
 
-                count
-            } else {
-                0
-            };
-
-            Ok(ImportResult {
-                baseline_count,
-                test_execution_count,
-            })
+            merged
         })();
 
         // Always detach, even if the merge failed
@@ -1087,6 +1297,33 @@ impl PytestDiffDatabase {
         result
     }
 
+    /// `file:` URI for ATTACHing a source database only to read from it.
+    ///
+    /// A source with no `-wal` or `-journal` file has no writer and nothing
+    /// left to recover, so it is opened `immutable`: SQLite takes no locks
+    /// and creates no `-wal`/`-shm` files next to it. Otherwise the source is
+    /// attached normally so its journal is honoured. `%`, `?` and `#` are
+    /// percent-encoded to keep them part of the path.
+    fn metadata_source_uri(path: &str) -> String {
+        let mut uri = String::with_capacity(path.len() + 24);
+        uri.push_str("file:");
+        for c in path.chars() {
+            match c {
+                '%' => uri.push_str("%25"),
+                '?' => uri.push_str("%3f"),
+                '#' => uri.push_str("%23"),
+                _ => uri.push(c),
+            }
+        }
+        let has_journal = ["-wal", "-journal"]
+            .iter()
+            .any(|suffix| Path::new(&format!("{path}{suffix}")).exists());
+        if !has_journal {
+            uri.push_str("?mode=ro&immutable=1");
+        }
+        uri
+    }
+
     fn get_external_metadata_internal(
         &self,
         source_db_path: &str,
@@ -1098,11 +1335,14 @@ impl PytestDiffDatabase {
         }
 
         // ATTACH requires a write lock
-        let conn = self.conn.write();
+        let conn = write_conn(&self.conn)?;
 
         // Attach the source database
-        conn.execute("ATTACH DATABASE ?1 AS source_db", params![source_db_path])
-            .with_context(|| format!("Failed to attach source database: {}", source_db_path))?;
+        conn.execute(
+            "ATTACH DATABASE ?1 AS source_db",
+            params![Self::metadata_source_uri(source_db_path)],
+        )
+        .with_context(|| format!("Failed to attach source database: {}", source_db_path))?;
 
         let result = conn
             .query_row(
@@ -1120,29 +1360,110 @@ impl PytestDiffDatabase {
         result
     }
 
+    fn get_external_metadata_bulk_internal(
+        &self,
+        source_db_paths: &[String],
+        key: &str,
+    ) -> Result<HashMap<String, Option<String>>> {
+        let mut values = HashMap::with_capacity(source_db_paths.len());
+
+        // ATTACH requires a write lock
+        let conn = write_conn(&self.conn)?;
+
+        for chunk in source_db_paths.chunks(MAX_ATTACHED) {
+            // Attach each existing source of this batch as src0..srcN
+            let mut aliases: Vec<String> = Vec::with_capacity(chunk.len());
+            let mut attached: Vec<&String> = Vec::with_capacity(chunk.len());
+            for path in chunk {
+                let alias = format!("src{}", aliases.len());
+                let ok = Path::new(path).exists()
+                    && conn
+                        .execute(
+                            &format!("ATTACH DATABASE ?1 AS {alias}"),
+                            params![Self::metadata_source_uri(path)],
+                        )
+                        .is_ok();
+                if ok {
+                    aliases.push(alias);
+                    attached.push(path);
+                } else {
+                    values.insert(path.clone(), None);
+                }
+            }
+            if aliases.is_empty() {
+                continue;
+            }
+
+            // One query for the whole batch; if any source can't be read (e.g.
+            // no metadata table), fall back to one query per source
+            match Self::query_attached_metadata(&conn, &aliases, key) {
+                Ok(rows) => {
+                    for (index, value) in rows {
+                        values.insert(attached[index].clone(), value);
+                    }
+                }
+                Err(_) => {
+                    for (alias, path) in aliases.iter().zip(&attached) {
+                        let value =
+                            Self::query_attached_metadata(&conn, std::slice::from_ref(alias), key)
+                                .ok()
+                                .and_then(|rows| rows.into_iter().next())
+                                .and_then(|(_, value)| value);
+                        values.insert((*path).clone(), value);
+                    }
+                }
+            }
+
+            // Always detach
+            for alias in &aliases {
+                conn.execute(&format!("DETACH DATABASE {alias}"), [])
+                    .with_context(|| format!("Failed to detach {alias}"))?;
+            }
+        }
+
+        Ok(values)
+    }
+
+    /// Read `key` from the metadata table of each attached alias in one
+    /// UNION ALL query, as `(alias index, value)` rows
+    fn query_attached_metadata(
+        conn: &Connection,
+        aliases: &[String],
+        key: &str,
+    ) -> rusqlite::Result<Vec<(usize, Option<String>)>> {
+        let sql = aliases
+            .iter()
+            .enumerate()
+            .map(|(i, alias)| {
+                format!("SELECT {i}, (SELECT data FROM {alias}.metadata WHERE dataid = ?1)")
+            })
+            .collect::<Vec<_>>()
+            .join(" UNION ALL ");
+        let mut stmt = conn.prepare(&sql)?;
+        let rows = stmt.query_map(params![key], |row| {
+            Ok((row.get::<_, i64>(0)? as usize, row.get(1)?))
+        })?;
+        rows.collect()
+    }
+
     fn set_metadata_internal(&self, key: &str, value: &str) -> Result<()> {
-        let conn = self.conn.write();
-        conn.execute(
-            "INSERT OR REPLACE INTO metadata (dataid, data) VALUES (?1, ?2)",
-            params![key, value],
-        )
-        .context("Failed to set metadata")?;
+        let conn = write_conn(&self.conn)?;
+        conn.prepare_cached("INSERT OR REPLACE INTO metadata (dataid, data) VALUES (?1, ?2)")?
+            .execute(params![key, value])
+            .context("Failed to set metadata")?;
         Ok(())
     }
 
     fn get_metadata_internal(&self, key: &str) -> Result<Option<String>> {
-        let conn = self.conn.read();
-        conn.query_row(
-            "SELECT data FROM metadata WHERE dataid = ?1",
-            params![key],
-            |row| row.get(0),
-        )
-        .optional()
-        .context("Failed to get metadata")
+        let conn = read_conn(&self.conn)?;
+        let mut stmt = conn.prepare_cached("SELECT data FROM metadata WHERE dataid = ?1")?;
+        stmt.query_row(params![key], |row| row.get(0))
+            .optional()
+            .context("Failed to get metadata")
     }
 
     fn get_test_dependencies_internal(&self, test_name: &str) -> Result<Vec<String>> {
-        let conn = self.conn.read();
+        let conn = read_conn(&self.conn)?;
         let mut stmt = conn.prepare(
             "SELECT DISTINCT fp.filename
              FROM test_execution te
@@ -1157,7 +1478,7 @@ impl PytestDiffDatabase {
     }
 
     fn get_file_dependents_internal(&self, filename: &str) -> Result<Vec<String>> {
-        let conn = self.conn.read();
+        let conn = read_conn(&self.conn)?;
         let mut stmt = conn.prepare(
             "SELECT DISTINCT te.test_name
              FROM test_execution te
@@ -1172,26 +1493,25 @@ impl PytestDiffDatabase {
     }
 
     fn get_baseline_fingerprint_internal(&self, filename: &str) -> Result<Option<Fingerprint>> {
-        let conn = self.conn.read();
+        let conn = read_conn(&self.conn)?;
 
-        conn.query_row(
+        let mut stmt = conn.prepare_cached(
             "SELECT filename, method_checksums, mtime, fsha
              FROM baseline_fp
              WHERE filename = ?1",
-            params![filename],
-            |row| {
-                let checksums_blob: Vec<u8> = row.get(1)?;
-                let checksums = deserialize_checksums(&checksums_blob);
-
-                Ok(Fingerprint {
-                    filename: row.get(0)?,
-                    checksums,
-                    mtime: row.get(2)?,
-                    file_hash: row.get(3)?,
-                    blocks: None,
-                })
-            },
-        )
+        )?;
+        stmt.query_row(params![filename], |row| {
+            let checksums_blob: Vec<u8> = row.get(1)?;
+            let checksums = deserialize_checksums(&checksums_blob);
+
+            Ok(Fingerprint {
+                filename: row.get(0)?,
+                checksums,
+                mtime: row.get(2)?,
+                file_hash: row.get(3)?,
+                blocks: None,
+            })
+        })
         .optional()
         .context("Failed to query baseline fingerprint")
     }
@@ -1200,7 +1520,7 @@ impl PytestDiffDatabase {
     ///
     /// Returns a HashMap of filename -> Fingerprint for efficient lookup
     pub fn get_all_baseline_fingerprints(&self) -> Result<HashMap<String, Fingerprint>> {
-        let conn = self.conn.read();
+        let conn = read_conn(&self.conn)?;
 
         let mut stmt =
             conn.prepare("SELECT filename, method_checksums, mtime, fsha FROM baseline_fp")?;
@@ -1295,6 +1615,47 @@ mod tests {
         assert_eq!(stats["file_count"], 1);
     }
 
+    #[test]
+    fn test_in_memory_database() {
+        let db = PytestDiffDatabase::new_internal(IN_MEMORY_PATH).unwrap();
+        assert!(db.get_fingerprint_rust("missing.py").unwrap().is_none());
+        assert!(!Path::new(IN_MEMORY_PATH).exists());
+    }
+
+    #[test]
+    fn test_repeated_baseline_writes_reuse_statements() {
+        let mut db = PytestDiffDatabase::new_internal(IN_MEMORY_PATH).unwrap();
+
+        for i in 0..3 {
+            let fp = Fingerprint {
+                filename: format!("mod{}.py", i),
+                checksums: vec![i],
+                file_hash: format!("hash{}", i),
+                mtime: 1.0,
+                blocks: None,
+            };
+            db.save_baseline_fingerprint_internal(fp).unwrap();
+            db.set_metadata_internal("baseline_commit", &format!("commit{}", i))
+                .unwrap();
+        }
+
+        let fp = db.get_baseline_fingerprint_internal("mod2.py").unwrap();
+        assert_eq!(fp.unwrap().checksums, vec![2]);
+        assert_eq!(
+            db.get_metadata_internal("baseline_commit").unwrap(),
+            Some("commit2".to_string())
+        );
+        assert_eq!(db.get_stats_internal().unwrap()["baseline_count"], 3);
+    }
+
+    #[test]
+    fn test_synchronous_level() {
+        assert_eq!(synchronous_level(None), "NORMAL");
+        assert_eq!(synchronous_level(Some("off")), "OFF");
+        assert_eq!(synchronous_level(Some(" FULL ")), "FULL");
+        assert_eq!(synchronous_level(Some("bogus")), "NORMAL");
+    }
+
     #[test]
     fn test_checksum_serialization() {
         let checksums = vec![123, -456, 789, -1];
@@ -1748,6 +2109,76 @@ mod tests {
         assert_eq!(stats["baseline_count"], 1);
     }
 
+    #[test]
+    fn test_get_external_metadata_bulk_across_batches() {
+        let dir = tempfile::tempdir().unwrap();
+        let mut paths = Vec::new();
+        // More sources than fit in one ATTACH batch; every third has no commit
+        for i in 0..(MAX_ATTACHED + 2) {
+            let path = dir.path().join(format!("source{i}.db"));
+            let db = PytestDiffDatabase::new_internal(path.to_str().unwrap()).unwrap();
+            if i % 3 != 0 {
+                db.set_metadata_internal("baseline_commit", &format!("commit{i}"))
+                    .unwrap();
+            }
+            db.close_and_checkpoint().unwrap();
+            paths.push(path.to_str().unwrap().to_string());
+        }
+        let missing = dir.path().join("missing.db").to_str().unwrap().to_string();
+        let garbage = dir.path().join("garbage.db");
+        std::fs::write(&garbage, b"not a sqlite database").unwrap();
+        let garbage = garbage.to_str().unwrap().to_string();
+        paths.push(missing.clone());
+        paths.insert(1, garbage.clone());
+
+        let reader = PytestDiffDatabase::new_internal(IN_MEMORY_PATH).unwrap();
+        let values = reader
+            .get_external_metadata_bulk_internal(&paths, "baseline_commit")
+            .unwrap();
+
+        assert_eq!(values.len(), paths.len());
+        assert_eq!(values[&missing], None);
+        assert_eq!(values[&garbage], None);
+        for i in 0..(MAX_ATTACHED + 2) {
+            let path = dir.path().join(format!("source{i}.db"));
+            let expected = (i % 3 != 0).then(|| format!("commit{i}"));
+            assert_eq!(values[path.to_str().unwrap()], expected);
+        }
+    }
+
+    #[test]
+    fn test_get_external_metadata_reads_source_immutable() {
+        // The source is attached through a file: URI; ?, # and % must stay literal
+        let dir = tempfile::tempdir().unwrap();
+        let path = dir.path().join("run?id=1#100%.db");
+        let path = path.to_str().unwrap();
+        let db = PytestDiffDatabase::new_internal(path).unwrap();
+        db.set_metadata_internal("baseline_commit", "abc").unwrap();
+        db.close_and_checkpoint().unwrap();
+        // Closing the last connection removes the source's -wal and -shm
+        drop(db);
+
+        let reader = PytestDiffDatabase::new_internal(IN_MEMORY_PATH).unwrap();
+        assert_eq!(
+            reader
+                .get_external_metadata_internal(path, "baseline_commit")
+                .unwrap(),
+            Some("abc".to_string())
+        );
+        let values = reader
+            .get_external_metadata_bulk_internal(&[path.to_string()], "baseline_commit")
+            .unwrap();
+        assert_eq!(values[path], Some("abc".to_string()));
+
+        // Checkpointed sources are read without leaving -wal/-shm files behind
+        let mut files: Vec<_> = std::fs::read_dir(dir.path())
+            .unwrap()
+            .map(|entry| entry.unwrap().file_name())
+            .collect();
+        files.sort();
+        assert_eq!(files, ["run?id=1#100%.db"]);
+    }
+
     #[test]
     fn test_merge_from_old_db_without_test_data() {
         // Same as above but for merge path
@@ -15,9 +15,36 @@ use std::time::UNIX_EPOCH;
 use walkdir::WalkDir;
 
 use crate::database::PytestDiffDatabase;
-use crate::parser::parse_module_internal;
+use crate::fingerprint_cache::FingerprintCache;
+use crate::parser::parse_module_hashed;
+use crate::path_str;
 use crate::types::{Block, ChangedFiles, Fingerprint};
 
+/// Content at least this large is hashed with BLAKE3's multithreaded `update_rayon`
+const PARALLEL_HASH_THRESHOLD: usize = 128 * 1024;
+
+/// BLAKE3 digest of file content, splitting large inputs across the rayon pool
+fn hash_content(content: &[u8]) -> blake3::Hash {
+    if content.len() >= PARALLEL_HASH_THRESHOLD {
+        blake3::Hasher::new().update_rayon(content).finalize()
+    } else {
+        blake3::hash(content)
+    }
+}
+
+/// Modification time of `path` in seconds since the Unix epoch
+fn file_mtime(path: &Path) -> Result<f64> {
+    Ok(std::fs::metadata(path)?
+        .modified()?
+        .duration_since(UNIX_EPOCH)?
+        .as_secs_f64())
+}
+
+/// Whether a file's current mtime equals the one stored with its fingerprint
+fn mtime_matches(current: f64, stored: f64) -> bool {
+    (current - stored).abs() < 0.001
+}
+
 /// Convert an absolute path to a relative path by stripping the project root prefix.
 /// Falls back to the original path if it doesn't start with project_root.
 fn make_relative(abs_path: &str, project_root: &str) -> String {
@@ -31,15 +58,30 @@ fn make_relative(abs_path: &str, project_root: &str) -> String {
 ///
 /// # Arguments
 /// * `path` - Path to the Python file
+/// * `project_root` - If given, the returned filename is made relative to it
+/// * `cache` - Optional FingerprintCache consulted before reading the file
 ///
 /// # Returns
 /// * Fingerprint containing blocks, checksums, hash, and mtime
 #[pyfunction]
-#[pyo3(signature = (path, project_root=None))]
-pub fn calculate_fingerprint(path: &str, project_root: Option<&str>) -> PyResult<Fingerprint> {
-    let mut fingerprint = calculate_fingerprint_internal(path).map_err(|e| {
-        pyo3::exceptions::PyIOError::new_err(format!("Failed to calculate fingerprint: {}", e))
-    })?;
+#[pyo3(signature = (path, project_root=None, cache=None))]
+pub fn calculate_fingerprint(
+    py: Python<'_>,
+    path: PathBuf,
+    project_root: Option<PathBuf>,
+    cache: Option<&FingerprintCache>,
+) -> PyResult<Fingerprint> {
+    let path = path_str(&path)?;
+    let project_root = project_root.as_deref().map(path_str).transpose()?;
+    let mut fingerprint = py
+        .allow_threads(|| match cache {
+            // Reuse the cached fingerprint while the file's mtime is unchanged
+            Some(cache) => cache.get_or_calculate_internal(path),
+            None => calculate_fingerprint_internal(path),
+        })
+        .map_err(|e| {
+            pyo3::exceptions::PyIOError::new_err(format!("Failed to calculate fingerprint: {}", e))
+        })?;
 
     if let Some(root) = project_root {
         fingerprint.filename = make_relative(&fingerprint.filename, root);
@@ -48,6 +90,40 @@ pub fn calculate_fingerprint(path: &str, project_root: Option<&str>) -> PyResult
     Ok(fingerprint)
 }
 
+/// Calculate fingerprints for many Python files in parallel
+///
+/// Releases the GIL while files are read, hashed and parsed on the rayon
+/// thread pool. Results are returned in the order of `paths`; the first
+/// unreadable or unparsable file fails the whole batch.
+#[pyfunction]
+#[pyo3(signature = (paths, project_root=None))]
+pub fn calculate_fingerprints_batch(
+    py: Python<'_>,
+    paths: Vec<PathBuf>,
+    project_root: Option<PathBuf>,
+) -> PyResult<Vec<Fingerprint>> {
+    let paths = paths
+        .iter()
+        .map(|path| path_str(path))
+        .collect::<PyResult<Vec<_>>>()?;
+    let project_root = project_root.as_deref().map(path_str).transpose()?;
+    py.allow_threads(|| {
+        paths
+            .par_iter()
+            .map(|path| {
+                let mut fingerprint = calculate_fingerprint_internal(path)?;
+                if let Some(root) = project_root {
+                    fingerprint.filename = make_relative(&fingerprint.filename, root);
+                }
+                Ok(fingerprint)
+            })
+            .collect::<Result<Vec<_>>>()
+    })
+    .map_err(|e| {
+        pyo3::exceptions::PyIOError::new_err(format!("Failed to calculate fingerprint: {}", e))
+    })
+}
+
 pub(crate) fn calculate_fingerprint_internal(path: &str) -> Result<Fingerprint> {
     let path = Path::new(path);
 
@@ -56,10 +132,11 @@ pub(crate) fn calculate_fingerprint_internal(path: &str) -> Result<Fingerprint>
         .with_context(|| format!("Failed to read file: {}", path.display()))?;
 
     // Calculate file-level hash using Blake3 (fast!)
-    let file_hash = blake3::hash(content.as_bytes()).to_hex().to_string();
+    let hash = hash_content(content.as_bytes());
+    let file_hash = hash.to_hex().to_string();
 
-    // Parse and extract blocks
-    let blocks = parse_module_internal(&content)
+    // Parse and extract blocks (reused when the same content was seen before)
+    let blocks = parse_module_hashed(&content, &hash)
         .map_err(|e| anyhow::anyhow!("Failed to parse Python file: {}", e))?;
 
     // Extract checksums
@@ -189,13 +266,20 @@ fn save_baseline_internal(
                 );
             }
 
-            // Check if we can skip this file (hash unchanged) - only when not forcing
+            // Check if we can skip this file (mtime or hash unchanged) - only when not forcing
             // Lookup by relative path since baselines are stored with relative paths
             if !force {
                 if let Some(existing) = existing_baselines.get(&rel_path) {
+                    // mtime unchanged since the stored fingerprint - skip without reading
+                    // (same Level 1 check as detect_changes)
+                    if file_mtime(path).is_ok_and(|mtime| mtime_matches(mtime, existing.mtime)) {
+                        skipped_unchanged.fetch_add(1, Ordering::Relaxed);
+                        return (rel_path, None);
+                    }
+
                     // Compute Blake3 hash (cheap: ~1ms for typical file)
                     if let Ok(content) = std::fs::read_to_string(path) {
-                        let current_hash = blake3::hash(content.as_bytes()).to_hex().to_string();
+                        let current_hash = hash_content(content.as_bytes()).to_hex().to_string();
 
                         if current_hash == existing.file_hash {
                             // Hash matches - file content unchanged, skip expensive AST parsing
@@ -395,20 +479,15 @@ fn check_file_changed_with_baseline(
     };
 
     // Level 1: mtime check (fastest)
-    let metadata = std::fs::metadata(path)?;
-    let current_mtime = metadata
-        .modified()?
-        .duration_since(UNIX_EPOCH)?
-        .as_secs_f64();
-
-    if (current_mtime - stored_fp.mtime).abs() < 0.001 {
+    if mtime_matches(file_mtime(path)?, stored_fp.mtime) {
         // mtime unchanged - file definitely not modified
         return Ok(None);
     }
 
     // Level 2: file hash check (fast)
     let content = std::fs::read_to_string(path)?;
-    let current_hash = blake3::hash(content.as_bytes()).to_hex().to_string();
+    let hash = hash_content(content.as_bytes());
+    let current_hash = hash.to_hex().to_string();
 
     if current_hash == stored_fp.file_hash {
         // Hash unchanged - content is identical (mtime changed but not content)
@@ -416,7 +495,7 @@ fn check_file_changed_with_baseline(
     }
 
     // Level 3: block checksum comparison (precise)
-    let current_blocks = parse_module_internal(&content)
+    let current_blocks = parse_module_hashed(&content, &hash)
         .map_err(|e| anyhow::anyhow!("Parse error in {}: {}", rel_filename, e))?;
 
     let current_checksums: Vec<i32> = current_blocks.iter().map(|b| b.checksum).collect();
@@ -555,7 +634,7 @@ pub fn process_coverage_data(
     test_file: &str,
     verbose: bool,
     scope_paths: Vec<String>,
-    cache: Option<&crate::fingerprint_cache::FingerprintCache>,
+    cache: Option<&FingerprintCache>,
 ) -> PyResult<Vec<Fingerprint>> {
     let fingerprints = process_coverage_data_internal(
         coverage_data,
@@ -578,7 +657,7 @@ fn process_coverage_data_internal(
     test_file: &str,
     verbose: bool,
     scope_paths: Vec<String>,
-    cache: Option<&crate::fingerprint_cache::FingerprintCache>,
+    cache: Option<&FingerprintCache>,
 ) -> Result<Vec<Fingerprint>> {
     let project_root_path = Path::new(project_root);
     let test_file_path = Path::new(test_file);
@@ -788,6 +867,16 @@ mod tests {
         assert!(fingerprint.mtime > 0.0);
     }
 
+    #[test]
+    fn test_hash_content_parallel_matches_serial() {
+        let content = "x = 1\n".repeat(PARALLEL_HASH_THRESHOLD);
+        assert!(content.len() >= PARALLEL_HASH_THRESHOLD);
+        assert_eq!(
+            hash_content(content.as_bytes()),
+            blake3::hash(content.as_bytes())
+        );
+    }
+
     #[test]
     fn test_fingerprint_hash_stability() {
         let mut file = NamedTempFile::new().unwrap();
@@ -897,6 +986,46 @@ mod tests {
         );
     }
 
+    #[test]
+    fn test_save_baseline_trusts_unchanged_mtime() {
+        let dir = tempfile::tempdir().unwrap();
+        let root = std::fs::canonicalize(dir.path()).unwrap().join("project");
+        std::fs::create_dir_all(&root).unwrap();
+        let module = root.join("app.py");
+        std::fs::write(&module, "def foo():\n    return 1\n").unwrap();
+
+        let db_path = dir.path().join("baseline.db");
+        let db_str = db_path.to_str().unwrap();
+        let root_str = root.to_str().unwrap();
+        let stored_hash = || {
+            PytestDiffDatabase::open(db_str)
+                .unwrap()
+                .get_baseline_fingerprint_rust("app.py")
+                .unwrap()
+                .unwrap()
+                .file_hash
+        };
+
+        save_baseline_internal(db_str, root_str, false, vec![], false).unwrap();
+        let original = stored_hash();
+
+        // Rewrite the file but restore its mtime: incremental runs skip it unread
+        let mtime = std::fs::metadata(&module).unwrap().modified().unwrap();
+        std::fs::write(&module, "def foo():\n    return 2\n").unwrap();
+        std::fs::File::options()
+            .write(true)
+            .open(&module)
+            .unwrap()
+            .set_modified(mtime)
+            .unwrap();
+        save_baseline_internal(db_str, root_str, false, vec![], false).unwrap();
+        assert_eq!(stored_hash(), original);
+
+        // force=true always recomputes
+        save_baseline_internal(db_str, root_str, false, vec![], true).unwrap();
+        assert_ne!(stored_hash(), original);
+    }
+
     #[test]
     fn test_find_python_files_skips_venv() {
         // Create a temp directory with a non-hidden project root inside
@@ -63,6 +63,15 @@ impl FingerprintCache {
         Ok(fingerprint)
     }
 
+    /// Insert a precomputed fingerprint for a path
+    ///
+    /// The fingerprint's mtime is used for later validity checks.
+    pub fn insert(&self, path: &str, fingerprint: Fingerprint) {
+        self.cache
+            .write()
+            .put(path.to_string(), (fingerprint.mtime, fingerprint));
+    }
+
     /// Clear the cache
     pub fn clear(&self) {
         self.cache.write().clear();
@@ -7,6 +7,7 @@
 // - Coverage collection integration
 
 use pyo3::prelude::*;
+use std::path::Path;
 
 mod cache;
 mod database;
@@ -15,14 +16,25 @@ mod fingerprint_cache;
 mod parser;
 mod types;
 
-pub use database::{ImportResult, PytestDiffDatabase};
+pub use database::{ImportResult, PytestDiffDatabase, Transaction};
 pub use fingerprint::{
-    calculate_fingerprint, detect_changes, process_coverage_data, save_baseline,
+    calculate_fingerprint, calculate_fingerprints_batch, detect_changes, process_coverage_data,
+    save_baseline,
 };
 pub use fingerprint_cache::FingerprintCache;
 pub use parser::parse_module;
 pub use types::{Block, ChangedFiles, Fingerprint, TestExecution};
 
+/// Borrow a path received from Python (`str` or `os.PathLike`) as UTF-8
+pub(crate) fn path_str(path: &Path) -> PyResult<&str> {
+    path.to_str().ok_or_else(|| {
+        pyo3::exceptions::PyValueError::new_err(format!(
+            "Path is not valid UTF-8: {}",
+            path.display()
+        ))
+    })
+}
+
 /// Python module initialization
 #[pymodule]
 fn _core(m: &Bound<'_, PyModule>) -> PyResult<()> {
@@ -33,11 +45,13 @@ fn _core(m: &Bound<'_, PyModule>) -> PyResult<()> {
     m.add_class::<TestExecution>()?;
     m.add_class::<PytestDiffDatabase>()?;
     m.add_class::<ImportResult>()?;
+    m.add_class::<Transaction>()?;
     m.add_class::<FingerprintCache>()?;
 
     // Register functions
     m.add_function(wrap_pyfunction!(parse_module, m)?)?;
     m.add_function(wrap_pyfunction!(calculate_fingerprint, m)?)?;
+    m.add_function(wrap_pyfunction!(calculate_fingerprints_batch, m)?)?;
     m.add_function(wrap_pyfunction!(detect_changes, m)?)?;
     m.add_function(wrap_pyfunction!(save_baseline, m)?)?;
     m.add_function(wrap_pyfunction!(process_coverage_data, m)?)?;
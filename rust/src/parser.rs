@@ -5,12 +5,25 @@
 
 use anyhow::Result;
 use crc32fast::Hasher;
+use lru::LruCache;
+use parking_lot::Mutex;
 use pyo3::prelude::*;
 use rustpython_parser::{ast, Parse};
 use rustpython_parser_core::source_code::RandomLocator;
+use std::num::NonZeroUsize;
+use std::sync::OnceLock;
 
 use crate::types::Block;
 
+/// Maximum number of distinct sources kept by `parse_module_hashed`
+const PARSE_CACHE_SIZE: NonZeroUsize = match NonZeroUsize::new(4096) {
+    Some(size) => size,
+    None => panic!("PARSE_CACHE_SIZE must be non-zero"),
+};
+
+/// Parsed blocks keyed by the BLAKE3 hash of the source text
+static PARSE_CACHE: OnceLock<Mutex<LruCache<[u8; 32], Vec<Block>>>> = OnceLock::new();
+
 /// Parse a Python module and extract all code blocks
 ///
 /// # Arguments
@@ -190,6 +203,23 @@ pub(crate) fn parse_module_internal(source: &str) -> Result<Vec<Block>> {
     Ok(blocks)
 }
 
+/// Parse a module whose BLAKE3 hash is already known, reusing earlier results
+///
+/// Blocks only depend on the source text, so identical contents (empty
+/// `__init__.py` files, files touched without edits) are parsed once per
+/// process. Parse errors are not cached.
+pub(crate) fn parse_module_hashed(source: &str, hash: &blake3::Hash) -> Result<Vec<Block>> {
+    let cache = PARSE_CACHE.get_or_init(|| Mutex::new(LruCache::new(PARSE_CACHE_SIZE)));
+
+    if let Some(blocks) = cache.lock().get(hash.as_bytes()) {
+        return Ok(blocks.clone());
+    }
+
+    let blocks = parse_module_internal(source)?;
+    cache.lock().put(*hash.as_bytes(), blocks.clone());
+    Ok(blocks)
+}
+
 /// Recursively extract blocks from a list of statements
 fn extract_blocks_from_statements(
     statements: &[ast::Stmt],
@@ -635,4 +665,28 @@ def foo(
 
         assert!(result.is_err());
     }
+
+    #[test]
+    fn test_parse_module_hashed_reuses_blocks() {
+        let source = "def cached_once():\n    return 'parse cache'\n";
+        let hash = blake3::hash(source.as_bytes());
+
+        let first = parse_module_hashed(source, &hash).unwrap();
+        assert!(PARSE_CACHE.get().unwrap().lock().contains(hash.as_bytes()));
+
+        let second = parse_module_hashed(source, &hash).unwrap();
+        assert_eq!(first, second);
+        assert_eq!(first, parse_module_internal(source).unwrap());
+    }
+
+    #[test]
+    fn test_parse_module_hashed_does_not_cache_errors() {
+        let source = "def broken_cached(";
+        let hash = blake3::hash(source.as_bytes());
+
+        assert!(parse_module_hashed(source, &hash).is_err());
+        if let Some(cache) = PARSE_CACHE.get() {
+            assert!(!cache.lock().contains(hash.as_bytes()));
+        }
+    }
 }